@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from db import Base
 from datetime import datetime
@@ -18,3 +18,7 @@ class RideBooking(Base):
     pickup_location = relationship("Start",foreign_keys=[pickup_location_id],)
     drop_location = relationship("Destination", foreign_keys=[drop_location_id])
 
+    __table_args__ = (
+        Index("ix_ride_bookings_trip_id_passenger_id", "trip_id", "passenger_id"),  # bookings of a trip, booking lookup
+    )
+
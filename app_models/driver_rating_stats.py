@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from db import Base
+
+# running totals of each driver's sentiment-scored ratings, updated with every rating
+# so the suggestion ranking reads one row per driver instead of every rating
+class DriverRatingStats(Base):
+    __tablename__ = "driver_rating_stats"
+
+    driver_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)  # ratings that have a sentiment score
+    rating_sum = Column(Float, nullable=False, default=0)  # sum of their numeric 1-5 ratings
+    sentiment_sum = Column(Float, nullable=False, default=0)  # sum of their 1-5 sentiment scores
+
+    # 70% average numeric rating, 30% average sentiment
+    @property
+    def overall_rating(self):
+        if not self.rating_count:
+            return None
+        return (self.rating_sum / self.rating_count) * 0.7 + (self.sentiment_sum / self.rating_count) * 0.3
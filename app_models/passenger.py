@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from db import Base
 from datetime import datetime
 
@@ -12,6 +12,10 @@ class Passenger(Base):
     status = Column(String(20), default="Pending")  # Pending, Confirmed, Completed, Cancelled
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_passengers_user_id_trip_id", "user_id", "trip_id"),  # trips of a rider, booking lookup
+    )
 
 
-    
\ No newline at end of file
+
+    
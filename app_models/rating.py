@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Column, Integer, ForeignKey, String, Float
 from sqlalchemy.orm import relationship
 from db import Base
 
@@ -9,9 +9,11 @@ class Rating(Base):
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)
     rated_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    driver_id = Column(Integer, ForeignKey("users.id"), nullable=True)  #  to store driver ratings
+    driver_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  #  to store driver ratings
     rating = Column(Integer, nullable=False)
     feedback = Column(String(255), nullable=True)  # Optional feedback
+    sentiment_score = Column(Float, nullable=True)  # 1-5 sentiment of the feedback, computed once when the rating is created
+    sentiment_model_version = Column(String(64), nullable=True)  # version of the model file that produced sentiment_score
 
 
 
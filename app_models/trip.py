@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, ForeignKey, Index
 from db import Base
 from datetime import datetime
 
@@ -20,3 +20,8 @@ class Trip(Base):
     
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Reference to the driver (user)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)  # Reference to the vehicle
+
+    __table_args__ = (
+        Index("ix_trips_user_id_date", "user_id", "date"),  # trips of a driver
+        Index("ix_trips_date_id", "date", "id"),  # listings ordered/paginated by (date, id)
+    )
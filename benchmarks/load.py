@@ -0,0 +1,178 @@
+"""Load-test the main endpoints against a seeded dataset and report latency percentiles.
+
+    python -m benchmarks.load                                   # fresh SQLite dataset, app served in-process
+    python -m benchmarks.load --requests 500 --concurrency 32 --output bench.json
+    python -m benchmarks.load --baseline bench.json             # also report the p95 change against an earlier run
+    python -m benchmarks.load --database-url mysql+mysqlconnector://user:pw@localhost/bench --no-seed --base-url http://localhost:8000
+
+Each endpoint gets its own phase of --requests requests from --concurrency concurrent clients, after a short
+warmup. Without --base-url the app is served in-process (httpx ASGI transport) on --database-url, which is seeded
+with benchmarks.seed unless --no-seed is given. With --base-url requests go to a running server, which must use
+the database that was seeded.
+
+Prints one JSON object (commit, dataset scale, and per endpoint: status counts, throughput and p50/p95/p99
+latency in ms) so runs on different commits can be diffed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+ENDPOINTS = ["trips_list", "suggestion", "booking_lookup", "trip_bookings", "login"]
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# request factories: each returns (method, url, kwargs) for a random request of that endpoint
+def request_factories(rng, sample, scale):
+    from benchmarks.seed import FIRST_DATE, PASSWORD, email
+
+    def date_from():
+        return (FIRST_DATE + timedelta(days=rng.randrange(scale["days"]))).isoformat()
+
+    return {
+        "trips_list": lambda: ("GET", "/trips/trips/", {"params": {"limit": 50, "date_from": date_from()}}),
+        "suggestion": lambda: ("GET", "/trips/suggestion/", {"params": {"limit": 50, "date_from": date_from()}}),
+        "booking_lookup": lambda: ("GET", "/bookings/ride_bookings/trip/booking_id/{}/{}".format(*rng.choice(sample["bookings"])), {}),
+        "trip_bookings": lambda: ("GET", f"/bookings/trips/{rng.choice(sample['bookings'])[0]}", {}),
+        "login": lambda: ("POST", "/users/login/", {"data": {"username": email(rng.randint(1, scale["users"])), "password": PASSWORD}}),
+    }
+
+# (trip_id, user_id) pairs with a booking and the dataset size, read back from the database
+def sample_dataset(engine, size=1000):
+    from sqlalchemy import func, select
+    from app_models.passenger import Passenger
+    from app_models.user import User
+    with engine.connect() as conn:
+        bookings = [tuple(row) for row in conn.execute(select(Passenger.trip_id, Passenger.user_id).limit(size))]
+        users = conn.scalar(select(func.count()).select_from(User))
+    if not bookings:
+        raise SystemExit("no bookings in the database - seed it first (drop --no-seed)")
+    return {"bookings": bookings}, users
+
+async def run_phase(client, make_request, requests, concurrency):
+    latencies, statuses = [], Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, url, kwargs = make_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                statuses[str(response.status_code)] += 1
+            except Exception as exc: # connection errors count as failures, they don't stop the run
+                statuses[type(exc).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+def summarize(latencies, statuses, elapsed):
+    p = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "ok": ok,
+        "statuses": dict(sorted(statuses.items())),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(p[49], 2), "p95": round(p[94], 2), "p99": round(p[98], 2),
+            "mean": round(statistics.fmean(latencies), 2), "max": round(max(latencies), 2),
+        },
+    }
+
+async def run(args, factories):
+    import httpx
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from main import app
+        transport, base_url = httpx.ASGITransport(app=app), "http://bench"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        for name in args.endpoints:
+            await run_phase(client, factories[name], args.warmup, min(args.concurrency, args.warmup or 1))
+            results[name] = summarize(*await run_phase(client, factories[name], args.requests, args.concurrency))
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["endpoints"]
+    return {
+        name: {"p95_before": baseline[name]["latency_ms"]["p95"], "p95_after": result["latency_ms"]["p95"],
+               "p95_ratio": round(result["latency_ms"]["p95"] / baseline[name]["latency_ms"]["p95"], 2)}
+        for name, result in results.items() if name in baseline and baseline[name]["latency_ms"]["p95"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint load benchmark")
+    parser.add_argument("--database-url", help="database the app uses (default: a fresh SQLite file)")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--no-seed", action="store_true", help="use the data already in --database-url")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--trips", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=60, help="trips are spread over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare p95 latencies against")
+    args = parser.parse_args()
+
+    # the app reads its database settings at import, so point it at the benchmark database first
+    if args.database_url is None:
+        args.database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="carpooling-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SENTIMENT_WARMUP_ON_STARTUP", "false")
+    import db
+    from benchmarks import seed
+
+    scale = {"users": args.users, "drivers": args.drivers, "trips": args.trips, "bookings": args.bookings, "ratings": args.ratings, "days": args.days}
+    if not args.no_seed:
+        counts = seed.seed(db.engine, args.users, args.drivers, args.trips, args.bookings, args.ratings,
+                           days=args.days, seed=args.seed, log=lambda message: print(message, file=sys.stderr))
+        scale.update(counts)
+    sample, scale["users"] = sample_dataset(db.engine)
+
+    rng = random.Random(args.seed)
+    results = asyncio.run(run(args, request_factories(rng, sample, scale)))
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "database": db.engine.dialect.name,
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "scale": scale,
+        "endpoints": results,
+    }
+    if args.baseline:
+        report["baseline"] = compare(results, args.baseline)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Fire many concurrent seat reservations at one trip and check nothing is oversold.
+
+    python -m benchmarks.seat_reservation --requests 500 --concurrency 100 --seats 120
+    python -m benchmarks.seat_reservation --mode async --database-url mysql+mysqlconnector://user:pw@localhost/bench
+
+Prints one JSON object (throughput, outcome counts, seats before/after) and exits non-zero if seats were oversold.
+The benchmark creates its own user, vehicle and trip in the target database.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+import db
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from app_models.trip import Trip
+from crud import trip as trip_crud
+from crud_async import trip as trip_async_crud
+from migrations import runner
+
+def _engine_options(url):
+    options = db.engine_options(url)
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"]["timeout"] = 60 # writers queue on SQLite's database lock instead of failing
+    return options
+
+def create_trip(url, seats):
+    engine = create_engine(url, **_engine_options(url))
+    runner.upgrade(engine, log=lambda message: None) # the schema production has, migration-added indexes and constraints included
+    session = sessionmaker(bind=engine)()
+    driver = User(full_name="Benchmark Driver", email=f"bench-{time.time_ns()}@example.com", password="-", is_driver=True)
+    session.add(driver)
+    session.flush()
+    vehicle = Vehicle(make="Bench", model="Mark", license_plate="BENCH", user_id=driver.id, available_seat=seats, vehicle_type="Van")
+    session.add(vehicle)
+    session.flush()
+    trip = Trip(pickup_location="A", drop_location="B", date=datetime.utcnow(), seats_available=seats, price=1.0, user_id=driver.id, vehicle_id=vehicle.id)
+    session.add(trip)
+    session.commit()
+    trip_id = trip.id
+    session.close()
+    return engine, trip_id
+
+def seats_left(engine, trip_id):
+    session = sessionmaker(bind=engine)()
+    try:
+        return session.get(Trip, trip_id).seats_available
+    finally:
+        session.close()
+
+def run_threads(engine, trip_id, requests, concurrency, seats_per_booking):
+    Session = sessionmaker(bind=engine)
+
+    def book(_):
+        session = Session()
+        try:
+            return trip_crud.reserve_seats(session, trip_id, seats_per_booking)[0]
+        except Exception:
+            return None
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(book, range(requests)))
+
+def run_async(url, trip_id, requests, concurrency, seats_per_booking):
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_url = make_url(url).set(drivername=db.ASYNC_DRIVERS.get(make_url(url).get_backend_name(), make_url(url).drivername))
+    options = _engine_options(url)
+    options.pop("poolclass", None)
+
+    async def main():
+        engine = create_async_engine(async_url, **options)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        limit = asyncio.Semaphore(concurrency)
+
+        async def book():
+            async with limit, Session() as session:
+                try:
+                    return (await trip_async_crud.reserve_seats(session, trip_id, seats_per_booking))[0]
+                except Exception:
+                    return None
+
+        try:
+            return await asyncio.gather(*(book() for _ in range(requests)))
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent seat reservation benchmark")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--mode", choices=["threads", "async"], default="threads")
+    parser.add_argument("--requests", type=int, default=500, help="bookings to attempt")
+    parser.add_argument("--concurrency", type=int, default=100, help="bookings in flight at once")
+    parser.add_argument("--seats", type=int, default=120, help="seats on the trip")
+    parser.add_argument("--seats-per-booking", type=int, default=1)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'seat_benchmark.db')}"
+    engine, trip_id = create_trip(url, args.seats)
+
+    started = time.perf_counter()
+    if args.mode == "threads":
+        outcomes = run_threads(engine, trip_id, args.requests, args.concurrency, args.seats_per_booking)
+    else:
+        outcomes = run_async(url, trip_id, args.requests, args.concurrency, args.seats_per_booking)
+    elapsed = time.perf_counter() - started
+
+    reserved = sum(1 for outcome in outcomes if outcome is True)
+    final_seats = seats_left(engine, trip_id)
+    report = {
+        "mode": args.mode,
+        "database": make_url(url).get_backend_name(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "bookings_per_second": round(args.requests / elapsed, 1),
+        "reserved": reserved,
+        "rejected_full": sum(1 for outcome in outcomes if outcome is False),
+        "errors": sum(1 for outcome in outcomes if outcome is None),
+        "seats_initial": args.seats,
+        "seats_final": final_seats,
+        # every seat taken belongs to exactly one successful booking, and the count never went negative
+        "oversold": final_seats < 0 or args.seats - final_seats != reserved * args.seats_per_booking,
+    }
+    print(json.dumps(report))
+    engine.dispose()
+    sys.exit(1 if report["oversold"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Seed a synthetic carpooling dataset for benchmarks.
+
+    python -m benchmarks.seed --database-url sqlite:///./bench.db --users 2000 --drivers 200 --trips 5000 --bookings 2000 --ratings 5000
+
+Creates the schema through the migrations, then inserts users (the first --drivers are drivers, each with one
+vehicle), trips, pickup/drop-off locations, passengers with their ride bookings, and ratings whose feedback and stars
+are drawn from suggestion/uber_reviews_without_reviewid.csv. Driver rating stats are rebuilt at the end. The same
+--seed gives the same dataset. Every user logs in with PASSWORD.
+
+The target database must be empty: rows are inserted with explicit ids so the seed works on MySQL too
+(no RETURNING). On MySQL keep --bookings <= --users, since ride_bookings.passenger_id references users.id
+while the app stores passengers.id in it.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+import config
+import db
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from app_models.trip import Trip
+from app_models.start import Start
+from app_models.destination import Destination
+from app_models.passenger import Passenger
+from app_models.booking import RideBooking
+from app_models.rating import Rating
+from crud import rating as rating_crud
+from migrations import runner
+from services.passwords import hash_password
+
+PASSWORD = "bench-password"
+REVIEWS_CSV = os.path.join(config.BASE_DIR, "suggestion", "uber_reviews_without_reviewid.csv")
+SEED_MODEL_VERSION = "seed-star-score"  # ratings carry the review's stars as their sentiment score, no model needed
+FIRST_DATE = datetime(2025, 1, 1, 6, 0)
+CHUNK = 5000
+VEHICLE_TYPES = ["Car", "Van", "Tuk", "Bike"]
+
+def email(user_id):
+    return f"user{user_id}@bench.example"
+
+# (feedback, stars) pairs from the reviews dataset
+def load_reviews(path=REVIEWS_CSV):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["content"][:255], int(row["score"])) for row in csv.DictReader(f) if row["content"] and row["score"]]
+
+def _insert(session, model, rows):
+    for start in range(0, len(rows), CHUNK):
+        session.execute(insert(model), rows[start:start + CHUNK])
+
+def _locations(rng, count):
+    # points scattered over ~20 km around Colombo
+    return [
+        {"id": i, "location_name": f"Location {i}", "latitude": 6.93 + rng.uniform(-0.1, 0.1), "longitude": 79.86 + rng.uniform(-0.1, 0.1)}
+        for i in range(1, count + 1)
+    ]
+
+def seed(engine, users=2000, drivers=200, trips=5000, bookings=2000, ratings=5000, locations=500, days=60, seed=42, log=print):
+    if drivers < 1 or users <= drivers:
+        raise ValueError("need at least one driver and one rider (users > drivers >= 1)")
+    rng = random.Random(seed)
+    runner.upgrade(engine, log=lambda message: None)
+    Session = sessionmaker(bind=engine)
+    started = time.perf_counter()
+    with Session() as session:
+        if session.scalar(select(func.count()).select_from(User)):
+            raise ValueError("seed expects an empty database")
+        password = hash_password(PASSWORD)  # one bcrypt hash shared by every user
+        _insert(session, User, [
+            {"id": i, "full_name": f"User {i}", "email": email(i), "password": password, "is_driver": i <= drivers,
+             "nic_number": f"NIC{i:06d}", "license_number": f"LIC{i:06d}" if i <= drivers else "",
+             "profile_picture": f"https://example.com/users/{i}.png" if i % 3 else None}
+            for i in range(1, users + 1)
+        ])
+        _insert(session, Vehicle, [
+            {"id": i, "make": "Make", "model": f"Model {i % 7}", "license_plate": f"BENCH-{i}", "user_id": i,
+             "available_seat": 4, "vehicle_type": VEHICLE_TYPES[i % len(VEHICLE_TYPES)],
+             "image_link": f"https://example.com/vehicles/{i}.png" if i % 2 else None}
+            for i in range(1, drivers + 1)
+        ])
+        trip_drivers = [rng.randint(1, drivers) for _ in range(trips)]
+        _insert(session, Trip, [
+            {"id": i, "pickup_location": f"Pickup {rng.randint(1, locations)}", "drop_location": f"Drop {rng.randint(1, locations)}",
+             "date": FIRST_DATE + timedelta(minutes=rng.randrange(days * 24 * 60)), "seats_available": rng.randint(0, 4),
+             "price": round(rng.uniform(200, 2000), 2), "ride_fare": round(rng.uniform(50, 500), 2), "estimated_time": f"{rng.randint(10, 90)} min",
+             "user_id": driver, "vehicle_id": driver, "status": "Scheduled", "is_completed": False, "is_canceled": rng.random() < 0.05}
+            for i, driver in enumerate(trip_drivers, start=1)
+        ])
+        _insert(session, Start, _locations(rng, locations))
+        _insert(session, Destination, _locations(rng, locations))
+
+        # distinct (trip, rider) pairs; riders are the non-driver users
+        pairs = set()
+        while len(pairs) < min(bookings, trips * (users - drivers)):
+            pairs.add((rng.randint(1, trips), rng.randint(drivers + 1, users)))
+        pairs = sorted(pairs)
+        _insert(session, Passenger, [
+            {"id": i, "user_id": rider, "trip_id": trip_id, "status": "Confirmed"}
+            for i, (trip_id, rider) in enumerate(pairs, start=1)
+        ])
+        _insert(session, RideBooking, [
+            {"id": i, "trip_id": trip_id, "passenger_id": i, "pickup_location_id": rng.randint(1, locations),
+             "drop_location_id": rng.randint(1, locations), "confirmed": True}
+            for i, (trip_id, rider) in enumerate(pairs, start=1)
+        ])
+
+        reviews = load_reviews() if ratings else []
+        rating_rows = []
+        for i in range(1, ratings + 1):
+            feedback, stars = reviews[rng.randrange(len(reviews))]
+            trip_id = rng.randint(1, trips)
+            rating_rows.append({
+                "id": i, "trip_id": trip_id, "rated_by_user_id": rng.randint(drivers + 1, users), "driver_id": trip_drivers[trip_id - 1],
+                "rating": stars, "feedback": feedback, "sentiment_score": float(stars), "sentiment_model_version": SEED_MODEL_VERSION,
+            })
+        _insert(session, Rating, rating_rows)
+        session.commit()
+        rating_crud.rebuild_driver_stats(session)
+
+    counts = {"users": users, "drivers": drivers, "trips": trips, "bookings": len(pairs), "ratings": ratings, "locations": locations}
+    log(f"seeded {counts} in {time.perf_counter() - started:.1f}s")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic benchmark dataset")
+    parser.add_argument("--database-url", default=config.DATABASE_URL, help="empty database to seed (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--trips", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--ratings", type=int, default=5000)
+    parser.add_argument("--locations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, **db.engine_options(args.database_url))
+    counts = seed(engine, args.users, args.drivers, args.trips, args.bookings, args.ratings, args.locations, seed=args.seed)
+    print(json.dumps(counts))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare fp32 and dynamic int8 sentiment inference on the bundled reviews.
+
+    python -m benchmarks.sentiment_quantization --limit 2000 --threads 4
+
+Scores the same --limit reviews (a seeded sample of suggestion/uber_reviews_without_reviewid.csv) with each precision
+and prints one JSON object with, per precision:
+
+accuracy        - positive/negative agreement with the review's stars (4-5 positive, 1-2 negative, 3 left out),
+                  a score above 3 counting as positive
+mae_stars       - mean absolute difference between the 1-5 score and the stars
+batched_ms      - ms per review when scored --batch-size at a time, as ratings imports and backfills do
+single_ms_p50/p95 - ms for one review per call (--single calls), as a rating created through the API does
+load_seconds, model_file_mb, and for int8 how far it drifts from fp32: label_agreement, mean/max_score_diff
+
+The first int8 run quantizes the model and saves it to SENTIMENT_QUANTIZED_MODEL_PATH; later runs load it.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import config
+from benchmarks.seed import load_reviews
+from suggestion import sentiment
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def run(precision, texts, batch_size, single):
+    config.SENTIMENT_PRECISION = precision
+    sentiment.unload()
+    started = time.perf_counter()
+    sentiment.load()
+    load_seconds = time.perf_counter() - started
+    sentiment._infer(texts[:batch_size], batch_size) # warm up kernels and allocator outside the timings
+
+    started = time.perf_counter()
+    scores = sentiment._infer(texts, batch_size) # straight to the model, no score cache
+    batched = time.perf_counter() - started
+    single_ms = []
+    for text in texts[:single]:
+        started = time.perf_counter()
+        sentiment._infer([text])
+        single_ms.append((time.perf_counter() - started) * 1000)
+
+    path = config.SENTIMENT_QUANTIZED_MODEL_PATH if precision == "int8" else config.SENTIMENT_MODEL_PATH
+    return scores, {
+        "load_seconds": round(load_seconds, 2),
+        "model_file_mb": round(os.path.getsize(path) / 2**20, 1),
+        "batched_ms": round(batched * 1000 / len(texts), 2),
+        "single_ms_p50": round(percentile(single_ms, 50), 2),
+        "single_ms_p95": round(percentile(single_ms, 95), 2),
+    }
+
+def accuracy(scores, stars):
+    pairs = [(score > 3, star >= 4) for score, star in zip(scores, stars) if star != 3]
+    return round(sum(predicted == actual for predicted, actual in pairs) / len(pairs), 4)
+
+def main():
+    parser = argparse.ArgumentParser(description="fp32 vs int8 sentiment model: accuracy against review stars and latency")
+    parser.add_argument("--limit", type=int, default=1000, help="reviews to score")
+    parser.add_argument("--batch-size", type=int, default=config.SENTIMENT_BATCH_SIZE)
+    parser.add_argument("--single", type=int, default=100, help="one-review calls timed for the single-review latency")
+    parser.add_argument("--threads", type=int, default=config.SENTIMENT_TORCH_THREADS, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config.SENTIMENT_TORCH_THREADS = args.threads
+    config.SENTIMENT_SERVER_SOCKET = None # measure the model in this process
+    reviews = load_reviews()
+    sample = random.Random(args.seed).sample(reviews, min(args.limit, len(reviews)))
+    texts, stars = [text for text, _ in sample], [star for _, star in sample]
+
+    report = {"reviews": len(texts), "batch_size": args.batch_size, "threads": args.threads}
+    fp32_scores, report["fp32"] = run("fp32", texts, args.batch_size, args.single)
+    int8_scores, report["int8"] = run("int8", texts, args.batch_size, args.single)
+    for precision, scores in (("fp32", fp32_scores), ("int8", int8_scores)):
+        report[precision].update(accuracy=accuracy(scores, stars), mae_stars=round(statistics.fmean(abs(s - t) for s, t in zip(scores, stars)), 3))
+    diffs = [abs(a - b) for a, b in zip(fp32_scores, int8_scores)]
+    report["int8"].update(
+        label_agreement=round(sum((a > 3) == (b > 3) for a, b in zip(fp32_scores, int8_scores)) / len(texts), 4),
+        mean_score_diff=round(statistics.fmean(diffs), 4),
+        max_score_diff=round(max(diffs), 4),
+        batched_speedup=round(report["fp32"]["batched_ms"] / report["int8"]["batched_ms"], 2),
+    )
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
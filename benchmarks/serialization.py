@@ -0,0 +1,117 @@
+"""Time the trip listing serialization path before and after single-pass serialization.
+
+    python -m benchmarks.serialization --trips 10000 --repeats 5
+    python -m benchmarks.serialization --database-url mysql+mysqlconnector://user:pw@localhost/bench
+
+before: ORM Trip entities joined with driver/vehicle columns, one TripDetailOut built per row, then validated and
+        dumped again the way FastAPI handles response_model
+after:  trip/driver/vehicle columns selected as tuples, zipped into dicts and encoded once with orjson
+
+Prints one JSON object with the median query, serialize and total times of each path (ms per --trips rows) and
+whether both produce the same JSON. Without --database-url it seeds an in-memory SQLite database;
+a given database must be empty (see benchmarks.seed).
+"""
+import argparse
+import json
+import statistics
+import time
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import db
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from app_models.trip import Trip
+from crud import trip as trip_crud
+from benchmarks import seed
+from schemas.trip import TripDetailOut
+from services.serialization import records
+
+def seed_trips(engine, trips):
+    seed.seed(engine, users=200, drivers=100, trips=trips, bookings=0, ratings=0, locations=10, log=lambda message: None)
+    return sessionmaker(bind=engine)
+
+# the listing as it was: ORM rows -> TripDetailOut per row -> response_model validation -> JSON
+def before(session, trips, adapter):
+    started = time.perf_counter()
+    rows = (
+        session.query(Trip, User.full_name, User.profile_picture, Vehicle.vehicle_type, Vehicle.image_link)
+        .join(User, Trip.user_id == User.id)
+        .join(Vehicle, Trip.vehicle_id == Vehicle.id)
+        .order_by(Trip.date, Trip.id)
+        .limit(trips)
+        .all()
+    )
+    queried = time.perf_counter()
+    items = [
+        TripDetailOut(
+            **trip.__dict__,
+            driver_name=full_name,
+            driver_profile_picture=profile_picture,
+            vehicle_type=vehicle_type,
+            vehicle_image=image_link,
+        )
+        for trip, full_name, profile_picture, vehicle_type, image_link in rows
+    ]
+    body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+    return body, queried - started, time.perf_counter() - queried
+
+# the listing now: column tuples -> dicts -> orjson
+def after(session, trips, adapter):
+    started = time.perf_counter()
+    rows = (
+        session.query(*trip_crud.TRIP_COLUMNS, *trip_crud.DETAIL_COLUMNS)
+        .join(User, Trip.user_id == User.id)
+        .join(Vehicle, Trip.vehicle_id == Vehicle.id)
+        .order_by(Trip.date, Trip.id)
+        .limit(trips)
+        .all()
+    )
+    queried = time.perf_counter()
+    body = orjson.dumps(records(trip_crud.TRIP_DETAIL_FIELDS, rows, driver_overall_rating=None))
+    return body, queried - started, time.perf_counter() - queried
+
+def measure(Session, path, trips, repeats):
+    adapter = TypeAdapter(list[TripDetailOut])
+    query_times, serialize_times = [], []
+    body = None
+    for _ in range(repeats):
+        with Session() as session: # fresh identity map each run
+            body, query_seconds, serialize_seconds = path(session, trips, adapter)
+        query_times.append(query_seconds)
+        serialize_times.append(serialize_seconds)
+    query_ms = statistics.median(query_times) * 1000
+    serialize_ms = statistics.median(serialize_times) * 1000
+    return body, {"query_ms": round(query_ms, 1), "serialize_ms": round(serialize_ms, 1), "total_ms": round(query_ms + serialize_ms, 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Trip listing serialization benchmark")
+    parser.add_argument("--trips", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database-url", help="database to seed and query (default: in-memory SQLite)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        engine = create_engine(args.database_url, **db.engine_options(args.database_url))
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Session = seed_trips(engine, args.trips)
+
+    before_body, before_times = measure(Session, before, args.trips, args.repeats)
+    after_body, after_times = measure(Session, after, args.trips, args.repeats)
+    print(json.dumps({
+        "trips": args.trips,
+        "repeats": args.repeats,
+        "dialect": engine.dialect.name,
+        "before": before_times,
+        "after": after_times,
+        "serialize_speedup": round(before_times["serialize_ms"] / after_times["serialize_ms"], 1),
+        "total_speedup": round(before_times["total_ms"] / after_times["total_ms"], 1),
+        "same_json": orjson.loads(before_body) == orjson.loads(after_body),
+        "bytes": len(after_body),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
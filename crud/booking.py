@@ -6,26 +6,17 @@ from app_models.user import User
 
 def get_booking_id_by_trip_and_user(db: Session, trip_id: int, user_id: int):
     """
-    1) Find the passenger record where user_id = user_id and trip_id = trip_id.
-    2) Use passenger.id to find the matching RideBooking record in ride_bookings.
-    3) Return that RideBooking (or None if not found).
+    Find the RideBooking of a trip whose passenger_id is the id of the user's passenger record for that trip,
+    in one query joining passengers (user_id, trip_id) to ride_bookings (trip_id, passenger_id).
+    Returns None if the user has no passenger record or booking for the trip.
     """
-    # Step 1: Find passenger row
-    passenger = db.query(Passenger).filter(
-        Passenger.user_id == user_id, 
-        Passenger.trip_id == trip_id
-    ).first()
-
-    if not passenger:
-        return None  # Means no passenger record found for this user/trip
-
-    # Step 2: Use passenger.id to find the booking
-    booking = db.query(RideBooking).filter(
-        RideBooking.trip_id == trip_id,
-        RideBooking.passenger_id == passenger.id
-    ).first()
-
-    return booking
+    return (
+        db.query(RideBooking)
+        .join(Passenger, RideBooking.passenger_id == Passenger.id)
+        .filter(Passenger.user_id == user_id, Passenger.trip_id == trip_id, RideBooking.trip_id == trip_id)
+        .order_by(Passenger.id, RideBooking.id)
+        .first()
+    )
 
 #create booking
 def create_ride_booking(db: Session, ride_booking: RideBookingCreate):    
@@ -1,12 +1,22 @@
 from sqlalchemy.orm import Session
 from app_models.destination import Destination
 from schemas.destination import DestinationCreate
+from services.geo_index import destination_index
 
 def create_destination(db: Session, destination: DestinationCreate):
     db_destination = Destination(**destination.dict())
     db.add(db_destination)
     db.commit()
     db.refresh(db_destination)
+    destination_index.add(db_destination.id, db_destination.latitude, db_destination.longitude) # keep the location index current
     return db_destination
 
+# drop-off locations within radius_km of a point, nearest first, as (Destination, distance_km)
+def get_destinations_near(db: Session, latitude: float, longitude: float, radius_km: float, limit: int = 50):
+    matches = destination_index.within(db, latitude, longitude, radius_km)[:limit]
+    destinations = {
+        destination.id: destination
+        for destination in db.query(Destination).filter(Destination.id.in_([destination_id for destination_id, _ in matches])).all()
+    }
+    return [(destinations[destination_id], distance) for destination_id, distance in matches if destination_id in destinations]
 
@@ -10,3 +10,6 @@ def create_passenger(db: Session, passenger: PassengerCreate):
     return db_passenger
 
 
+# Get a passenger by ID
+def get_passenger(db: Session, passenger_id: int):
+    return db.query(Passenger).filter(Passenger.id == passenger_id).first()
@@ -1,10 +1,152 @@
+from collections import defaultdict
+from sqlalchemy import or_, func, select, insert, delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app_models.rating import Rating
+from app_models.driver_rating_stats import DriverRatingStats
 from schemas.rating import RatingCreate
+from suggestion import sentiment
 
+# create a rating, scoring the feedback sentiment once here so the suggestion ranking only reads stored scores
 def create_rating(db: Session, rating: RatingCreate):
     db_rating = Rating(**rating.dict())
+    # with the model disabled the score stays empty until scripts.backfill_sentiment runs
+    if db_rating.feedback and sentiment.is_enabled():
+        db_rating.sentiment_score = sentiment.get_sentiment_score(db_rating.feedback)
+        db_rating.sentiment_model_version = sentiment.get_model_version()
     db.add(db_rating)
-    db.commit()
+    if db_rating.driver_id is not None and db_rating.sentiment_score is not None:
+        add_to_driver_stats(db, db_rating.driver_id, 1, db_rating.rating, db_rating.sentiment_score)
+    db.commit() # rating and driver totals are committed together
     db.refresh(db_rating)
     return db_rating
+
+# add to a driver's running totals inside the caller's transaction (no commit)
+def add_to_driver_stats(db: Session, driver_id: int, count: int, rating_sum: float, sentiment_sum: float):
+    increment = (
+        update(DriverRatingStats)
+        .where(DriverRatingStats.driver_id == driver_id)
+        .values(
+            rating_count=DriverRatingStats.rating_count + count,
+            rating_sum=DriverRatingStats.rating_sum + rating_sum,
+            sentiment_sum=DriverRatingStats.sentiment_sum + sentiment_sum,
+        )
+    )
+    if db.execute(increment).rowcount:
+        return
+    # first scored rating for this driver; if another request inserted the row meanwhile, increment it instead
+    try:
+        with db.begin_nested():
+            db.add(DriverRatingStats(driver_id=driver_id, rating_count=count, rating_sum=rating_sum, sentiment_sum=sentiment_sum))
+    except IntegrityError:
+        db.execute(increment)
+
+# get the running totals for the given drivers, keyed by driver id
+def get_driver_stats(db: Session, driver_ids):
+    return {
+        stats.driver_id: stats
+        for stats in db.query(DriverRatingStats).filter(DriverRatingStats.driver_id.in_(set(driver_ids))).all()
+    }
+
+# recompute every driver's totals from the ratings table in one transaction
+def rebuild_driver_stats(db: Session):
+    db.execute(delete(DriverRatingStats))
+    db.execute(insert(DriverRatingStats).from_select(
+        ["driver_id", "rating_count", "rating_sum", "sentiment_sum"],
+        _driver_totals_query(),
+    ))
+    db.commit()
+
+# drivers whose stored totals differ from a fresh aggregate of the ratings table
+def check_driver_stats(db: Session, tolerance: float = 1e-6):
+    expected = {row.driver_id: row for row in db.execute(_driver_totals_query())}
+    stored = {stats.driver_id: stats for stats in db.query(DriverRatingStats).all()}
+    mismatched = []
+    for driver_id in expected.keys() | stored.keys():
+        want, have = expected.get(driver_id), stored.get(driver_id)
+        if (
+            want is None or have is None
+            or want.rating_count != have.rating_count
+            or abs(want.rating_sum - have.rating_sum) > tolerance
+            or abs(want.sentiment_sum - have.sentiment_sum) > tolerance
+        ):
+            mismatched.append(driver_id)
+    return sorted(mismatched)
+
+def _driver_totals_query():
+    return (
+        select(
+            Rating.driver_id,
+            func.count().label("rating_count"),
+            func.sum(Rating.rating).label("rating_sum"),
+            func.sum(Rating.sentiment_score).label("sentiment_sum"),
+        )
+        .where(Rating.driver_id.isnot(None), Rating.sentiment_score.isnot(None))
+        .group_by(Rating.driver_id)
+    )
+
+# score ratings with feedback that have no stored sentiment yet
+# rescore=True also rescores rows that were scored by a different model file
+def score_ratings(db: Session, rescore: bool = False, batch_size: int = 100):
+    model_version = sentiment.get_model_version()
+    needs_score = Rating.sentiment_score.is_(None)
+    if rescore:
+        needs_score = or_(needs_score, Rating.sentiment_model_version.is_(None), Rating.sentiment_model_version != model_version)
+
+    scored, last_id = 0, 0
+    while True:
+        batch = (
+            db.query(Rating)
+            .filter(Rating.id > last_id, Rating.feedback.isnot(None), Rating.feedback != "", needs_score)
+            .order_by(Rating.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return scored
+        # driver totals change by the difference between old and new scores
+        deltas = defaultdict(lambda: [0, 0.0, 0.0])
+        for db_rating, score in zip(batch, sentiment.get_sentiment_scores([r.feedback for r in batch])):
+            delta = deltas[db_rating.driver_id]
+            if db_rating.sentiment_score is None:
+                delta[0] += 1
+                delta[1] += db_rating.rating
+                delta[2] += score
+            else:
+                delta[2] += score - db_rating.sentiment_score
+            db_rating.sentiment_score = score
+            db_rating.sentiment_model_version = model_version
+        for driver_id, (count, rating_sum, sentiment_sum) in deltas.items():
+            if driver_id is not None:
+                add_to_driver_stats(db, driver_id, count, rating_sum, sentiment_sum)
+        last_id = batch[-1].id
+        scored += len(batch)
+        db.commit() # one transaction per batch so progress survives an interrupted run
+
+# insert a chunk of ratings (dicts of Rating columns) with one executemany; with score_sentiment the feedback is
+# scored in batches first. Driver totals get one update per driver and everything commits together.
+def bulk_create_ratings(db: Session, rows, score_sentiment: bool = False, batch_size: int = None):
+    for row in rows:
+        row.setdefault("sentiment_score", None)
+        row.setdefault("sentiment_model_version", None)
+    if score_sentiment:
+        with_feedback = [row for row in rows if row.get("feedback")]
+        model_version = sentiment.get_model_version()
+        for row, score in zip(with_feedback, sentiment.get_sentiment_scores([row["feedback"] for row in with_feedback], batch_size)):
+            row["sentiment_score"] = score
+            row["sentiment_model_version"] = model_version
+    if not rows:
+        return 0
+    db.execute(insert(Rating.__table__), rows) # plain executemany, no ORM bulk bookkeeping
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for row in rows:
+        if row.get("driver_id") is not None and row["sentiment_score"] is not None:
+            total = totals[row["driver_id"]]
+            total[0] += 1
+            total[1] += row["rating"]
+            total[2] += row["sentiment_score"]
+    for driver_id, (count, rating_sum, sentiment_sum) in totals.items():
+        add_to_driver_stats(db, driver_id, count, rating_sum, sentiment_sum)
+    db.commit()
+    return len(rows)
@@ -1,10 +1,18 @@
 from sqlalchemy.orm import Session
 from app_models.start import Start
 from schemas.start import StartCreate
+from services.geo_index import start_index
 
 def create_start(db: Session, start: StartCreate):
     db_start = Start(**start.dict())
     db.add(db_start)
     db.commit()
     db.refresh(db_start)
+    start_index.add(db_start.id, db_start.latitude, db_start.longitude) # keep the location index current
     return db_start
+
+# pickup locations within radius_km of a point, nearest first, as (Start, distance_km)
+def get_starts_near(db: Session, latitude: float, longitude: float, radius_km: float, limit: int = 50):
+    matches = start_index.within(db, latitude, longitude, radius_km)[:limit]
+    starts = {start.id: start for start in db.query(Start).filter(Start.id.in_([start_id for start_id, _ in matches])).all()}
+    return [(starts[start_id], distance) for start_id, distance in matches if start_id in starts]
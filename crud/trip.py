@@ -1,8 +1,21 @@
+import base64
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, case, or_, select, update
 from sqlalchemy.orm import Session
 from app_models.trip import Trip
-from schemas.trip import TripCreate, TripUpdate ,TripDetailOut
+from schemas.trip import TripCreate, TripUpdate, TripListParams
 from app_models.user import User
 from app_models.vehicle import Vehicle
+from app_models.booking import RideBooking
+from app_models.driver_rating_stats import DriverRatingStats
+from services.geo_index import start_index, destination_index
+from services.entity_cache import user_cache, vehicle_cache
+from services.serialization import records
+import config
+
+# nearest locations considered by a trips-near search
+NEAR_LOCATION_LIMIT = 1000
 
 # Create a new trip
 def create_trip(db: Session, trip: TripCreate):
@@ -20,52 +33,196 @@ def get_trip(db: Session, trip_id: int):
 def get_trips_by_driver(db: Session, user_id: int):
     return db.query(Trip).filter(Trip.user_id == user_id).all()
 
-# Get all trips with user details and vehicle details
-def get_all_trips(db: Session):
-    trips = (
-        db.query(
-            Trip,
-            User.full_name,
-            User.profile_picture,
-            Vehicle.vehicle_type,
-            Vehicle.image_link,
-        )
+# pagination cursor - the (date, id) of the last trip on a page, url-safe so it can go back in a query string
+def encode_cursor(date: datetime, trip_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date.isoformat()}|{trip_id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        date, trip_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(date), int(trip_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+# columns of a trip listing, selected as plain tuples (no ORM instances) in the field order of TripDetailOut
+TRIP_COLUMNS = (
+    Trip.pickup_location, Trip.drop_location, Trip.date, Trip.seats_available, Trip.price, Trip.ride_fare,
+    Trip.estimated_time, Trip.id, Trip.user_id, Trip.vehicle_id, Trip.status, Trip.is_completed, Trip.is_canceled,
+)
+DETAIL_COLUMNS = (User.full_name, User.profile_picture, Vehicle.vehicle_type, Vehicle.image_link)
+TRIP_DETAIL_FIELDS = tuple(column.key for column in TRIP_COLUMNS) + ("driver_name", "driver_profile_picture", "vehicle_type", "vehicle_image")
+
+# trip columns joined with driver and vehicle details
+def _trip_detail_query(db: Session):
+    return (
+        db.query(*TRIP_COLUMNS, *DETAIL_COLUMNS)
         .join(User, Trip.user_id == User.id)
         .join(Vehicle, Trip.vehicle_id == Vehicle.id)
-        .all()
     )
 
+# the listing filters of TripListParams, applied in SQL
+def _filter_trips(query, params: TripListParams):
+    if params.status is not None:
+        query = query.filter(Trip.status == params.status)
+    if params.active_only:
+        query = query.filter(Trip.is_completed.is_(False), Trip.is_canceled.is_(False))
+    if params.date_from is not None:
+        query = query.filter(Trip.date >= params.date_from)
+    if params.date_to is not None:
+        query = query.filter(Trip.date <= params.date_to)
+    if params.min_seats is not None:
+        query = query.filter(Trip.seats_available >= params.min_seats)
+    if params.max_price is not None:
+        query = query.filter(Trip.price <= params.max_price)
+    return query
+
+# one page of trips with driver and vehicle details, filtered and ordered by (date, id) in SQL
+# returns tuples in TRIP_DETAIL_FIELDS order and the cursor of the next page (None on the last page)
+# with use_entity_cache the driver/vehicle fields come from the entity cache instead of a join
+def get_trip_page(db: Session, params: TripListParams, use_entity_cache: Optional[bool] = None):
+    if use_entity_cache is None:
+        use_entity_cache = config.ENTITY_CACHE_LISTINGS
+    query = _filter_trips(db.query(*TRIP_COLUMNS) if use_entity_cache else _trip_detail_query(db), params)
+    if params.cursor:
+        after_date, after_id = decode_cursor(params.cursor)
+        query = query.filter(or_(Trip.date > after_date, and_(Trip.date == after_date, Trip.id > after_id)))
+
+    rows = query.order_by(Trip.date, Trip.id).limit(params.limit + 1).all() # one extra row tells us if there is a next page
+    if use_entity_cache:
+        detailed = _with_cached_details(db, rows)
+        if len(detailed) < len(rows):
+            # a trip whose driver or vehicle row is gone: the join skips it and fills the page from the rows after it
+            return get_trip_page(db, params, use_entity_cache=False)
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    if use_entity_cache:
+        rows = detailed[:params.limit]
+    return rows, next_cursor
+
+# attach driver and vehicle details from the entity cache; trips missing either are left out, as by the inner joins
+def _with_cached_details(db: Session, trips):
+    users = user_cache.get_many(db, [trip.user_id for trip in trips])
+    vehicles = vehicle_cache.get_many(db, [trip.vehicle_id for trip in trips])
     return [
-        TripDetailOut(
-            pickup_location=trip.Trip.pickup_location,
-            drop_location=trip.Trip.drop_location,
-            date=trip.Trip.date,
-            seats_available=trip.Trip.seats_available,
-            price=trip.Trip.price,
-            ride_fare=trip.Trip.ride_fare,
-            estimated_time=trip.Trip.estimated_time,
-            id=trip.Trip.id,
-            user_id=trip.Trip.user_id,
-            vehicle_id=trip.Trip.vehicle_id,
-            status=trip.Trip.status,
-            is_completed=trip.Trip.is_completed,
-            is_canceled=trip.Trip.is_canceled,
-            driver_name=trip.full_name,
-            driver_profile_picture=trip.profile_picture,
-            vehicle_type=trip.vehicle_type,
-            vehicle_image=trip.image_link,
-        )
+        (*trip, user["full_name"], user["profile_picture"], vehicle["vehicle_type"], vehicle["image_link"])
+        for trip, user, vehicle in ((trip, users.get(trip.user_id), vehicles.get(trip.vehicle_id)) for trip in trips)
+        if user is not None and vehicle is not None
+    ]
+
+# Get a page of trips with user details and vehicle details, as dicts ready for ORJSONResponse
+def get_all_trips(db: Session, params: TripListParams):
+    trips, next_cursor = get_trip_page(db, params)
+    return records(TRIP_DETAIL_FIELDS, trips, driver_overall_rating=None), next_cursor
+
+# blended 70% numeric / 30% sentiment rating of the trip's driver, from the running totals kept by crud.rating;
+# 0 for drivers without scored ratings (a rated driver has at least 1)
+DRIVER_RATING = case(
+    (
+        DriverRatingStats.rating_count > 0,
+        DriverRatingStats.rating_sum / DriverRatingStats.rating_count * 0.7
+        + DriverRatingStats.sentiment_sum / DriverRatingStats.rating_count * 0.3,
+    ),
+    else_=0.0,
+)
+
+# suggestion cursor - the (driver rating, id) of the last trip on a page
+def encode_rating_cursor(rating: float, trip_id: int) -> str:
+    return base64.urlsafe_b64encode(f"rating|{rating!r}|{trip_id}".encode()).decode()
+
+def decode_rating_cursor(cursor: str):
+    try:
+        kind, rating, trip_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if kind != "rating":
+            raise ValueError(kind)
+        return float(rating), int(trip_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+# one page of suggested trips: every trip matching the filters ranked by driver rating, best first, then by id;
+# unrated drivers last. Paged on (rating, id), so the ranking is global, not per page
+def get_suggestions(db: Session, params: TripListParams):
+    query = _filter_trips(
+        _trip_detail_query(db).add_columns(DRIVER_RATING).outerjoin(DriverRatingStats, DriverRatingStats.driver_id == Trip.user_id),
+        params,
+    )
+    if params.cursor:
+        after_rating, after_id = decode_rating_cursor(params.cursor)
+        query = query.filter(or_(DRIVER_RATING < after_rating, and_(DRIVER_RATING == after_rating, Trip.id > after_id)))
+
+    rows = query.order_by(DRIVER_RATING.desc(), Trip.id).limit(params.limit + 1).all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_rating_cursor(rows[-1][-1], rows[-1].id)
+    return [dict(zip(TRIP_DETAIL_FIELDS, row), driver_overall_rating=row[-1] or None) for row in rows], next_cursor
+
+# trips with driver and vehicle details by id (e.g. the trips a rider is booked on)
+def get_trip_details(db: Session, trip_ids):
+    trips = _trip_detail_query(db).filter(Trip.id.in_(trip_ids)).all()
+    return records(TRIP_DETAIL_FIELDS, trips, driver_overall_rating=None)
+
+# trips with a booked pickup (kind="pickup") or drop-off (kind="drop") within radius_km of a point, nearest first
+def get_trips_near(db: Session, latitude: float, longitude: float, radius_km: float, kind: str = "pickup", limit: int = 50):
+    index, location_column = (start_index, RideBooking.pickup_location_id) if kind == "pickup" else (destination_index, RideBooking.drop_location_id)
+    location_distance = dict(index.within(db, latitude, longitude, radius_km)[:NEAR_LOCATION_LIMIT])
+    if not location_distance:
+        return []
+
+    trip_distance = {}
+    for trip_id, location_id in db.query(RideBooking.trip_id, location_column).filter(location_column.in_(location_distance)).all():
+        distance = location_distance[location_id]
+        if distance < trip_distance.get(trip_id, float("inf")):
+            trip_distance[trip_id] = distance
+    nearest = sorted(trip_distance, key=trip_distance.get)[:limit]
+
+    trips = _trip_detail_query(db).filter(Trip.id.in_(nearest)).all()
+    results = [
+        dict(zip(TRIP_DETAIL_FIELDS, trip), driver_overall_rating=None, distance_km=trip_distance[trip.id])
         for trip in trips
     ]
+    return sorted(results, key=lambda trip: trip["distance_km"])
 
-#update seat available 
-def update_seat_availability(db: Session, trip_id: int, seats_available: int):
-    db_trip = get_trip(db, trip_id)
-    if db_trip:
-        db_trip.seats_available = seats_available
-        db.commit()
-        db.refresh(db_trip)
-    return db_trip
+# conditional seat updates - the check and the change are one UPDATE, so concurrent bookings can neither
+# oversell nor hold row locks while Python runs; RETURNING (where supported) reports the seats left
+def reserve_seats_statement(trip_id: int, seats: int, returning: bool):
+    statement = (
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.seats_available >= seats)
+        .values(seats_available=Trip.seats_available - seats)
+    )
+    return statement.returning(Trip.seats_available) if returning else statement
+
+def release_seats_statement(trip_id: int, seats: int, returning: bool):
+    vehicle_capacity = select(Vehicle.available_seat).where(Vehicle.id == Trip.vehicle_id).scalar_subquery()
+    statement = (
+        update(Trip)
+        .where(Trip.id == trip_id, Trip.seats_available + seats <= vehicle_capacity) # never more seats than the vehicle has
+        .values(seats_available=Trip.seats_available + seats)
+    )
+    return statement.returning(Trip.seats_available) if returning else statement
+
+# outcome of a conditional seat UPDATE: (changed, seats left or None)
+def seat_update_result(result, returning: bool):
+    if returning:
+        seats_left = result.scalar_one_or_none()
+        return seats_left is not None, seats_left
+    return result.rowcount == 1, None
+
+def _apply_seat_update(db: Session, statement_for, trip_id: int, seats: int):
+    returning = db.get_bind().dialect.update_returning
+    changed, seats_left = seat_update_result(db.execute(statement_for(trip_id, seats, returning)), returning)
+    db.commit()
+    return changed, seats_left
+
+# take seats on a trip if enough are left - returns (reserved, seats left or None)
+def reserve_seats(db: Session, trip_id: int, seats: int = 1):
+    return _apply_seat_update(db, reserve_seats_statement, trip_id, seats)
+
+# give seats back to a trip, up to the vehicle's capacity - returns (released, seats left or None)
+def release_seats(db: Session, trip_id: int, seats: int = 1):
+    return _apply_seat_update(db, release_seats_statement, trip_id, seats)
 
 # Update trip (e.g., status, is_completed, is_canceled)
 def update_trip(db: Session, trip_id: int, trip_update: TripUpdate):
@@ -1,14 +1,12 @@
 from sqlalchemy.orm import Session
 from app_models.user import User
 from schemas.user import UserCreate
-from passlib.context import CryptContext
+from services.entity_cache import user_cache
+from services.passwords import hash_password
 
-#using bcrypt for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Utility function to hash passwords
+# Utility function to hash passwords (blocking - async routes use services.passwords.password_pool)
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 # Get user by email
 def get_user_by_email(db: Session, email: str):
@@ -21,8 +19,9 @@ def create_user(db: Session, user: UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(db_user.id)
     return db_user
 
-# Get user by ID
+# Get user by ID (read through the entity cache)
 def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+    return user_cache.get(db, user_id)
\ No newline at end of file
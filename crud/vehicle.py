@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app_models.vehicle import Vehicle
 from schemas.vehicle import VehicleCreate
+from services.entity_cache import vehicle_cache
 
 # create an instance of vehicle and store in db
 def create_vehicle(db: Session, vehicle: VehicleCreate):
@@ -8,11 +9,12 @@ def create_vehicle(db: Session, vehicle: VehicleCreate):
     db.add(db_vehicle)
     db.commit()
     db.refresh(db_vehicle)
+    vehicle_cache.invalidate(db_vehicle.id)
     return db_vehicle
 
-# get vehicle details through vehicle id
+# get vehicle details through vehicle id (read through the entity cache)
 def get_vehicle(db: Session, vehicle_id: int):
-    return db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    return vehicle_cache.get(db, vehicle_id)
 
 # get vehivles by user id 
 def get_vehicles_by_user(db: Session, user_id: int):
@@ -2,16 +2,36 @@
 from sqlalchemy.orm import Session
 from app_models.vehicle_pricing import VehiclePricing
 from schemas.vehicle_pricing import VehiclePricingCreate
+from services.fares import pricing_table
+from services.entity_cache import vehicle_pricing_cache
 
 def create_vehicle_pricing(db: Session, vehicle_pricing: VehiclePricingCreate):
     db_vehicle_pricing = VehiclePricing(vehicle_type=vehicle_pricing.vehicle_type, rate_per_km=vehicle_pricing.rate_per_km)
     db.add(db_vehicle_pricing)
     db.commit()
     db.refresh(db_vehicle_pricing)
+    pricing_table.invalidate() # fare quotes pick up the new rate
+    vehicle_pricing_cache.invalidate(db_vehicle_pricing.vehicle_type)
     return db_vehicle_pricing
 
 def get_vehicle_pricings(db: Session, skip: int = 0, limit: int = 100):
     return db.query(VehiclePricing).offset(skip).limit(limit).all()
 
+# read through the entity cache
 def get_vehicle_pricing_by_type(db: Session, vehicle_type: str):
-    return db.query(VehiclePricing).filter(VehiclePricing.vehicle_type == vehicle_type).first()
\ No newline at end of file
+    return vehicle_pricing_cache.get(db, vehicle_type)
+
+# distance and fare for every quote, computed in one vectorized pass over the in-memory pricing table
+def quote_fares(db: Session, quotes):
+    distance_km, fares = pricing_table.quote(
+        db,
+        [quote.origin_lat for quote in quotes],
+        [quote.origin_lon for quote in quotes],
+        [quote.dest_lat for quote in quotes],
+        [quote.dest_lon for quote in quotes],
+        [quote.vehicle_type for quote in quotes],
+    )
+    return [
+        {"distance_km": distance, "fare": None if fare != fare else fare} # NaN -> no pricing for the vehicle type
+        for distance, fare in zip(distance_km.round(3).tolist(), fares.tolist())
+    ]
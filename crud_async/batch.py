@@ -0,0 +1,75 @@
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.batch import BatchCreateOut, BatchItemError
+
+def _error(loc, msg, error_type):
+    return {"loc": list(loc), "msg": msg, "type": error_type}
+
+# validate each raw item against the create schema -> ({index: schema instance}, {index: errors})
+def validate_items(schema, items):
+    valid, errors = {}, {}
+    for index, item in enumerate(items):
+        try:
+            valid[index] = schema.model_validate(item)
+        except ValidationError as exc:
+            errors[index] = [_error(error["loc"], error["msg"], error["type"]) for error in exc.errors()]
+    return valid, errors
+
+# items whose foreign keys point at rows that don't exist, with one IN query per referenced table
+# references maps a field of the schema to the model it points at, e.g. {"user_id": User}
+async def check_references(db: AsyncSession, valid, references):
+    errors = {}
+    for field, model in references.items():
+        wanted = {getattr(item, field) for item in valid.values()}
+        if not wanted:
+            continue
+        found = set(await db.scalars(select(model.id).where(model.id.in_(wanted))))
+        for index, item in valid.items():
+            if getattr(item, field) not in found:
+                errors.setdefault(index, []).append(_error([field], f"{model.__name__} {getattr(item, field)} not found", "not_found"))
+    return errors
+
+def _database_error(exc):
+    error_type = "integrity_error" if isinstance(exc, IntegrityError) else "database_error"
+    return [_error([], str(exc.orig).splitlines()[0], error_type)]
+
+# insert the valid items under a savepoint, so a row the database rejects (unique, length or other constraint)
+# only costs that row. The usual case is one flush that batches the INSERTs and reads the generated ids back
+# (RETURNING or lastrowid, no refresh SELECT per row); after a failure each item gets a savepoint of its own
+async def _insert(db: AsyncSession, model, valid, errors):
+    objects = {index: model(**item.dict()) for index, item in valid.items()}
+    try:
+        async with db.begin_nested():
+            db.add_all(objects.values())
+        return objects
+    except DBAPIError:
+        pass
+    objects = {}
+    for index, item in valid.items():
+        obj = model(**item.dict())
+        try:
+            async with db.begin_nested():
+                db.add(obj)
+        except DBAPIError as exc:
+            errors[index] = _database_error(exc)
+        else:
+            objects[index] = obj
+    return objects
+
+# create the valid items in one transaction and report the rest by position. Returns ({index: object}, BatchCreateOut).
+async def create_many(db: AsyncSession, model, schema, items, references=None):
+    valid, errors = validate_items(schema, items)
+    for index, item_errors in (await check_references(db, valid, references or {})).items():
+        errors[index] = item_errors
+        del valid[index]
+    objects = await _insert(db, model, valid, errors) if valid else {}
+    if objects:
+        await db.commit()
+    result = BatchCreateOut(
+        ids=[objects[index].id if index in objects else None for index in range(len(items))],
+        created=len(objects),
+        errors=[BatchItemError(index=index, errors=errors[index]) for index in sorted(errors)],
+    )
+    return objects, result
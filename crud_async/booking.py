@@ -0,0 +1,59 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app_models.booking import RideBooking
+from app_models.passenger import Passenger
+from app_models.trip import Trip
+from app_models.user import User
+from app_models.start import Start
+from app_models.destination import Destination
+from schemas.booking import RideBookingCreate
+from crud_async.batch import create_many
+
+# the booking of a trip for a user - joined through the user's passenger row for that trip, in one query
+async def get_booking_id_by_trip_and_user(db: AsyncSession, trip_id: int, user_id: int):
+    return await db.scalar(
+        select(RideBooking)
+        .join(Passenger, RideBooking.passenger_id == Passenger.id)
+        .where(Passenger.user_id == user_id, Passenger.trip_id == trip_id, RideBooking.trip_id == trip_id)
+        .order_by(Passenger.id, RideBooking.id)
+        .limit(1)
+    )
+
+#create booking
+async def create_ride_booking(db: AsyncSession, ride_booking: RideBookingCreate):
+    db_ride_booking = RideBooking(**ride_booking.dict())
+    db.add(db_ride_booking)
+    await db.commit()
+    return db_ride_booking
+
+# create many bookings in one transaction; invalid items are reported, not created
+async def create_ride_bookings(db: AsyncSession, items):
+    references = {"trip_id": Trip, "passenger_id": User, "pickup_location_id": Start, "drop_location_id": Destination}
+    _, result = await create_many(db, RideBooking, RideBookingCreate, items, references)
+    return result
+
+# get all ride bookings with passenger,start,end associated with a specific trip_id
+async def get_ride_bookings_by_trip(db: AsyncSession, trip_id: int):
+    result = await db.scalars(
+        select(RideBooking)
+        .options(
+            joinedload(RideBooking.passenger),
+            joinedload(RideBooking.pickup_location),
+            joinedload(RideBooking.drop_location),
+        )
+        .where(RideBooking.trip_id == trip_id)
+    )
+    return result.all()
+
+# Get a ride booking by ID
+async def get_ride_booking(db: AsyncSession, booking_id: int):
+    return await db.scalar(select(RideBooking).where(RideBooking.id == booking_id))
+
+# Update a ride booking (e.g., confirmation status)
+async def update_ride_booking(db: AsyncSession, booking_id: int, confirmed: bool):
+    db_ride_booking = await get_ride_booking(db, booking_id)
+    if db_ride_booking:
+        db_ride_booking.confirmed = confirmed
+        await db.commit()
+    return db_ride_booking
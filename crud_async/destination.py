@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.destination import Destination
+from schemas.destination import DestinationCreate
+from crud_async.batch import create_many
+from crud import destination as destination_crud
+from services.geo_index import destination_index
+
+async def create_destination(db: AsyncSession, destination: DestinationCreate):
+    db_destination = Destination(**destination.dict())
+    db.add(db_destination)
+    await db.commit()
+    destination_index.add(db_destination.id, db_destination.latitude, db_destination.longitude) # keep the location index current
+    return db_destination
+
+# create many drop-off locations in one transaction; invalid items are reported, not created
+async def create_destinations(db: AsyncSession, items):
+    destinations, result = await create_many(db, Destination, DestinationCreate, items)
+    for db_destination in destinations.values():
+        destination_index.add(db_destination.id, db_destination.latitude, db_destination.longitude)
+    return result
+
+# drop-off locations within radius_km of a point, nearest first, as (Destination, distance_km)
+async def get_destinations_near(db: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int = 50):
+    return await db.run_sync(destination_crud.get_destinations_near, latitude, longitude, radius_km, limit)
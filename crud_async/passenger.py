@@ -0,0 +1,22 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.passenger import Passenger
+from app_models.trip import Trip
+from app_models.user import User
+from schemas.passenger import PassengerCreate
+from crud_async.batch import create_many
+
+async def create_passenger(db: AsyncSession, passenger: PassengerCreate):
+    db_passenger = Passenger(**passenger.dict())
+    db.add(db_passenger)
+    await db.commit()
+    return db_passenger
+
+# create many passengers in one transaction; invalid items are reported, not created
+async def create_passengers(db: AsyncSession, items):
+    _, result = await create_many(db, Passenger, PassengerCreate, items, {"user_id": User, "trip_id": Trip})
+    return result
+
+# Get a passenger by ID
+async def get_passenger(db: AsyncSession, passenger_id: int):
+    return await db.scalar(select(Passenger).where(Passenger.id == passenger_id))
@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.start import Start
+from schemas.start import StartCreate
+from crud_async.batch import create_many
+from crud import start as start_crud
+from services.geo_index import start_index
+
+async def create_start(db: AsyncSession, start: StartCreate):
+    db_start = Start(**start.dict())
+    db.add(db_start)
+    await db.commit()
+    start_index.add(db_start.id, db_start.latitude, db_start.longitude) # keep the location index current
+    return db_start
+
+# create many pickup locations in one transaction; invalid items are reported, not created
+async def create_starts(db: AsyncSession, items):
+    starts, result = await create_many(db, Start, StartCreate, items)
+    for db_start in starts.values():
+        start_index.add(db_start.id, db_start.latitude, db_start.longitude)
+    return result
+
+# pickup locations within radius_km of a point, nearest first, as (Start, distance_km)
+async def get_starts_near(db: AsyncSession, latitude: float, longitude: float, radius_km: float, limit: int = 50):
+    return await db.run_sync(start_crud.get_starts_near, latitude, longitude, radius_km, limit)
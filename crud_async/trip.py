@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.trip import Trip
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from schemas.trip import TripCreate, TripUpdate
+from crud.trip import reserve_seats_statement, release_seats_statement, seat_update_result
+from crud_async.batch import create_many
+
+# Create a new trip
+async def create_trip(db: AsyncSession, trip: TripCreate):
+    db_trip = Trip(**trip.dict())
+    db.add(db_trip)
+    await db.commit()
+    return db_trip
+
+# create many trips in one transaction; items with invalid fields or an unknown driver/vehicle are reported, not created
+async def create_trips(db: AsyncSession, items):
+    _, result = await create_many(db, Trip, TripCreate, items, {"user_id": User, "vehicle_id": Vehicle})
+    return result
+
+# Get a trip by ID
+async def get_trip(db: AsyncSession, trip_id: int):
+    return await db.scalar(select(Trip).where(Trip.id == trip_id))
+
+# Get all trips by driver ID
+async def get_trips_by_driver(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Trip).where(Trip.user_id == user_id))).all()
+
+async def _apply_seat_update(db: AsyncSession, statement_for, trip_id: int, seats: int):
+    returning = db.get_bind().dialect.update_returning
+    changed, seats_left = seat_update_result(await db.execute(statement_for(trip_id, seats, returning)), returning)
+    await db.commit()
+    return changed, seats_left
+
+# take seats on a trip if enough are left, in one conditional UPDATE - returns (reserved, seats left or None)
+async def reserve_seats(db: AsyncSession, trip_id: int, seats: int = 1):
+    return await _apply_seat_update(db, reserve_seats_statement, trip_id, seats)
+
+# give seats back to a trip, up to the vehicle's capacity - returns (released, seats left or None)
+async def release_seats(db: AsyncSession, trip_id: int, seats: int = 1):
+    return await _apply_seat_update(db, release_seats_statement, trip_id, seats)
+
+# Update trip (e.g., status, is_completed, is_canceled)
+async def update_trip(db: AsyncSession, trip_id: int, trip_update: TripUpdate):
+    db_trip = await get_trip(db, trip_id)
+    if db_trip:
+        for key, value in trip_update.dict(exclude_unset=True).items():
+            setattr(db_trip, key, value)
+        await db.commit()
+    return db_trip
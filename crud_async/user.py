@@ -0,0 +1,17 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.user import User
+from schemas.user import UserCreate
+from services.entity_cache import user_cache
+
+# Get user by email
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(User).where(User.email == email))
+
+# Create new user - the password is hashed by the caller (off the event loop, see services.passwords)
+async def create_user(db: AsyncSession, user: UserCreate, hashed_password: str):
+    db_user = User( full_name=user.full_name,email=user.email,password=hashed_password, is_driver=user.is_driver, nic_number=user.nic_number,license_number=user.license_number)
+    db.add(db_user)
+    await db.commit()
+    user_cache.invalidate(db_user.id)
+    return db_user
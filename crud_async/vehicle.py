@@ -0,0 +1,22 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app_models.vehicle import Vehicle
+from schemas.vehicle import VehicleCreate
+from crud import vehicle as vehicle_crud
+from services.entity_cache import vehicle_cache
+
+# create an instance of vehicle and store in db
+async def create_vehicle(db: AsyncSession, vehicle: VehicleCreate):
+    db_vehicle = Vehicle(**vehicle.dict())
+    db.add(db_vehicle)
+    await db.commit()
+    vehicle_cache.invalidate(db_vehicle.id)
+    return db_vehicle
+
+# get vehicle details through vehicle id (read through the entity cache)
+async def get_vehicle(db: AsyncSession, vehicle_id: int):
+    return await db.run_sync(vehicle_crud.get_vehicle, vehicle_id)
+
+# get vehicles by user id
+async def get_vehicles_by_user(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(Vehicle).where(Vehicle.user_id == user_id))).all()
@@ -1,6 +1,18 @@
+import time
+_boot_started = time.perf_counter()
+
+import logging
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from db import engine
-# import all models - tables 
+from fastapi.responses import PlainTextResponse
+import config
+import db
+from services.runtime import rss_mb
+from services import entity_cache, metrics
+from services.passwords import password_pool
+from suggestion import sentiment
+# import all models so every mapper is registered; the schema itself is managed by `python -m migrations upgrade`
 from app_models import (
     user as user_models,
     booking as booking_models,
@@ -11,6 +23,7 @@ from app_models import (
     passenger as passenger_models,
     start as start_models,
     vehicle_pricing as pricing_models,
+    driver_rating_stats as driver_rating_stats_models,
 )
 
 # Import routers
@@ -24,20 +37,24 @@ from routers import (
     passenger as passenger_router,
     start as start_router,
     vehicle_pricing as pricing_router,
+    system as system_router,
 )
 
-# Create database tables
-user_models.Base.metadata.create_all(bind=engine)
-booking_models.Base.metadata.create_all(bind=engine)
-trip_models.Base.metadata.create_all(bind=engine)
-destination_models.Base.metadata.create_all(bind=engine)
-vehicle_models.Base.metadata.create_all(bind=engine)
-passenger_models.Base.metadata.create_all(bind=engine)
-start_models.Base.metadata.create_all(bind=engine)
-rating_models.Base.metadata.create_all(bind=engine)
-pricing_models.Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the sentiment model off the request path so the worker starts serving immediately
+    if config.SENTIMENT_ENABLED and config.SENTIMENT_WARMUP_ON_STARTUP:
+        threading.Thread(target=sentiment.warmup, name="sentiment-warmup", daemon=True).start()
+    yield
+    sentiment.cache.save()
+    password_pool.shutdown()
+    await db.dispose_async_engine()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+# per-route latency/status metrics and a Server-Timing header (db / inference / serialization) on every response
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Include routers
 app.include_router(user_router.router, prefix="/users", tags=["users"])
@@ -49,7 +66,39 @@ app.include_router(passenger_router.router, prefix="/passengers", tags=["passeng
 app.include_router(start_router.router, prefix="/starts", tags=["starts"])
 app.include_router(rating_router.router, prefix="/ratings", tags=["ratings"])
 app.include_router(pricing_router.router, prefix="/pricing", tags=["pricing"])
+app.include_router(system_router.router, prefix="/system", tags=["system"])
 
 @app.get("/")
 def read_root():
     return {"message": "Carpooling API is running"}
+
+# boot time (import to app ready) and current resident memory of this worker
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "boot_seconds": BOOT_SECONDS,
+        "rss_mb": round(rss_mb(), 1),
+        "sentiment": sentiment.get_status(),
+        "entity_cache": entity_cache.stats(),
+    }
+
+# Prometheus scrape endpoint - request, SQL and connection pool metrics of this worker
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    pool = db.pool_status()
+    pool_lines = []
+    for key, documentation in (
+        ("checked_out", "Connections currently checked out of the pool"),
+        ("idle", "Idle connections in the pool"),
+        ("overflow", "Overflow connections currently open"),
+        ("checkouts", "Connection checkouts since start"),
+        ("timeouts", "Connection checkouts that timed out"),
+        ("wait_seconds_total", "Total time spent waiting for a connection"),
+    ):
+        if key in pool:
+            pool_lines += metrics.gauge_lines(f"db_pool_{key}", documentation, pool[key])
+    return PlainTextResponse(metrics.render(pool_lines), media_type="text/plain; version=0.0.4")
+
+BOOT_SECONDS = round(time.perf_counter() - _boot_started, 3)
+logger.info("app booted in %.2fs, rss %.0f MB", BOOT_SECONDS, rss_mb())
@@ -0,0 +1,28 @@
+"""Run schema migrations against DATABASE_URL.
+
+    python -m migrations upgrade          # apply every pending migration
+    python -m migrations upgrade 0003     # apply pending migrations up to 0003
+    python -m migrations status           # list applied and pending migrations
+"""
+import argparse
+from db import engine
+from migrations import runner
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade.add_argument("target", nargs="?", help="last version to apply (default: all)")
+    commands.add_parser("status", help="show applied and pending migrations")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = runner.upgrade(engine, args.target)
+        print(f"{len(applied)} migration(s) applied" if applied else "database is up to date")
+    else:
+        applied = runner.applied_versions(engine)
+        for version, module in runner.discover():
+            print(f"[{'x' if version in applied else ' '}] {module.__name__.rsplit('.', 1)[-1]}")
+
+if __name__ == "__main__":
+    main()
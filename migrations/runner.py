@@ -0,0 +1,110 @@
+import importlib
+import os
+import re
+from datetime import datetime
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Versioned schema migrations. Each module in migrations/versions is named <version>_<description>.py
+# and defines upgrade(op); applied versions are recorded in the schema_migrations table. A migration runs in
+# one transaction unless the module sets transactional = False. The app never runs DDL itself: apply
+# migrations as a separate deploy step before starting workers.
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+VERSION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# schema operations available to a migration, all safe to re-run against a database that already has the change
+class Operations:
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.dialect = conn.dialect.name
+
+    def _inspector(self):
+        return inspect(self.conn)
+
+    def has_table(self, table):
+        return self._inspector().has_table(table)
+
+    def has_column(self, table, column):
+        return column in {c["name"] for c in self._inspector().get_columns(table)}
+
+    def has_index(self, table, index):
+        return index in {i["name"] for i in self._inspector().get_indexes(table)}
+
+    def execute(self, sql, **params):
+        return self.conn.execute(text(sql), params)
+
+    # add a column given its SQL type/constraints, e.g. add_column("ratings", "sentiment_score", "FLOAT NULL")
+    def add_column(self, table, column, ddl):
+        if not self.has_column(table, column):
+            self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+    def create_tables(self, metadata, tables):
+        metadata.create_all(self.conn, tables=[metadata.tables[name] for name in tables], checkfirst=True)
+
+    # online=True builds the index without blocking writes on large tables: MySQL/InnoDB uses
+    # ALGORITHM=INPLACE, LOCK=NONE and PostgreSQL uses CONCURRENTLY, which needs a migration with
+    # transactional = False. Other dialects fall back to a plain CREATE INDEX.
+    def create_index(self, name, table, columns, unique=False, online=False):
+        concurrent = online and self.dialect == "postgresql"
+        # checked on the connection's isolation level: inspecting the schema below autobegins, even under AUTOCOMMIT
+        if concurrent and self.conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+            raise RuntimeError(f"online index {name} needs a migration with transactional = False on PostgreSQL")
+        if self.has_index(table, name):
+            return
+        unique_sql = "UNIQUE " if unique else ""
+        concurrently, options = "", ""
+        if online and self.dialect == "mysql":
+            options = " ALGORITHM=INPLACE LOCK=NONE"
+        elif concurrent:
+            concurrently = "CONCURRENTLY "
+        self.execute(f"CREATE {unique_sql}INDEX {concurrently}{name} ON {table} ({', '.join(columns)}){options}")
+
+def discover():
+    migrations = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        match = VERSION_FILE.match(filename)
+        if match:
+            migrations.append((match.group(1), importlib.import_module(f"migrations.versions.{filename[:-3]}")))
+    return migrations
+
+def applied_versions(engine: Engine):
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+# versions not yet applied to this database, in order
+def pending(engine: Engine):
+    applied = applied_versions(engine)
+    return [(version, module) for version, module in discover() if version not in applied]
+
+def _record(conn, version):
+    conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+
+# apply pending migrations up to and including target, each in its own transaction
+def upgrade(engine: Engine, target=None, log=print):
+    applied = []
+    for version, module in pending(engine):
+        if target is not None and version > target:
+            break
+        log(f"applying {module.__name__.rsplit('.', 1)[-1]}")
+        if getattr(module, "transactional", True):
+            with engine.begin() as conn:
+                module.upgrade(Operations(conn))
+                _record(conn, version)
+        else:
+            # statements such as CREATE INDEX CONCURRENTLY cannot run inside a transaction; operations
+            # are idempotent, so a migration interrupted here is simply re-run by the next upgrade
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                module.upgrade(Operations(conn))
+            with engine.begin() as conn:
+                _record(conn, version)
+        applied.append(version)
+    return applied
@@ -0,0 +1,106 @@
+# tables created by main.py before migrations existed - a no-op on databases that already have them
+# declared here as they were then, not imported from app_models: later columns and indexes come from their own
+# migrations, which therefore run on fresh databases too
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("full_name", String(255), index=True),
+    Column("email", String(255), unique=True, index=True),
+    Column("password", String(255)),
+    Column("is_driver", Boolean),
+    Column("nic_number", String(50), nullable=True),
+    Column("license_number", String(50), nullable=True),
+    Column("profile_picture", String(255), nullable=True),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "vehicles", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("make", String(50), nullable=False),
+    Column("model", String(50), nullable=False),
+    Column("license_plate", String(20), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id")),
+    Column("image_link", String(255)),
+    Column("available_seat", Integer, nullable=False),
+    Column("vehicle_type", String(50), nullable=False),
+)
+
+Table(
+    "vehicle_pricings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("vehicle_type", String(50), unique=True, index=True, nullable=False),
+    Column("rate_per_km", Float, nullable=False),
+)
+
+Table(
+    "trips", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("pickup_location", String(255), nullable=False),
+    Column("drop_location", String(255), nullable=False),
+    Column("date", DateTime, nullable=False),
+    Column("seats_available", Integer, nullable=False),
+    Column("price", Float, nullable=False),
+    Column("ride_fare", Float),
+    Column("estimated_time", String(20)),
+    Column("is_completed", Boolean),
+    Column("is_canceled", Boolean),
+    Column("status", String(20)),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("vehicle_id", Integer, ForeignKey("vehicles.id"), nullable=False),
+)
+
+Table(
+    "start", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("location_name", String(255), nullable=False),
+    Column("latitude", Float, nullable=True),
+    Column("longitude", Float, nullable=True),
+)
+
+Table(
+    "destinations", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("location_name", String(255), nullable=False),
+    Column("latitude", Float, nullable=True),
+    Column("longitude", Float, nullable=True),
+)
+
+Table(
+    "passengers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("trip_id", Integer, ForeignKey("trips.id"), nullable=False),
+    Column("status", String(20)),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "ride_bookings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("trip_id", Integer, ForeignKey("trips.id"), nullable=False),
+    Column("passenger_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("pickup_location_id", Integer, ForeignKey("start.id"), nullable=False),
+    Column("drop_location_id", Integer, ForeignKey("destinations.id"), nullable=False),
+    Column("confirmed", Boolean),
+    Column("booked_at", DateTime),
+)
+
+Table(
+    "ratings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("trip_id", Integer, ForeignKey("trips.id"), nullable=False),
+    Column("rated_by_user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("driver_id", Integer, ForeignKey("users.id"), nullable=True),
+    Column("rating", Integer, nullable=False),
+    Column("feedback", String(255), nullable=True),
+)
+
+def upgrade(op):
+    op.create_tables(metadata, [
+        "users", "vehicles", "vehicle_pricings", "trips", "start", "destinations", "passengers", "ride_bookings", "ratings",
+    ])
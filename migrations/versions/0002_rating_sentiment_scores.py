@@ -0,0 +1,4 @@
+# stored sentiment score of each rating, computed when the rating is created
+def upgrade(op):
+    op.add_column("ratings", "sentiment_score", "FLOAT NULL")
+    op.add_column("ratings", "sentiment_model_version", "VARCHAR(64) NULL")
@@ -0,0 +1,6 @@
+# running per-driver rating totals; fill with python -m scripts.rebuild_driver_stats after applying
+import db
+from app_models import user, driver_rating_stats  # noqa: F401 - register the table and the users table it references
+
+def upgrade(op):
+    op.create_tables(db.Base.metadata, ["driver_rating_stats"])
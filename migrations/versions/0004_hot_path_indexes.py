@@ -0,0 +1,10 @@
+# composite indexes for the filters behind the driver/rider trip lists, booking lookup and driver ratings
+# built online so trips/passengers/ride_bookings/ratings stay writable while the indexes build
+transactional = False
+
+def upgrade(op):
+    op.create_index("ix_trips_user_id_date", "trips", ["user_id", "date"], online=True)
+    op.create_index("ix_trips_date_id", "trips", ["date", "id"], online=True)
+    op.create_index("ix_passengers_user_id_trip_id", "passengers", ["user_id", "trip_id"], online=True)
+    op.create_index("ix_ride_bookings_trip_id_passenger_id", "ride_bookings", ["trip_id", "passenger_id"], online=True)
+    op.create_index("ix_ratings_driver_id", "ratings", ["driver_id"], online=True)
@@ -1,12 +1,39 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from crud import destination as destination_crud
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud_async import destination as destination_crud
 from schemas import destination as destination_schemas
-from db import get_db
+from schemas.batch import BatchCreate, BatchCreateOut
+from db import get_async_db
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/destinations/", response_model=destination_schemas.DestinationOut)
-def create_destination(destination: destination_schemas.DestinationCreate, db: Session = Depends(get_db)):
-    return destination_crud.create_destination(db, destination)
+async def create_destination(destination: destination_schemas.DestinationCreate, db: AsyncSession = Depends(get_async_db)):
+    return await destination_crud.create_destination(db, destination)
 
+# create many drop-off locations at once - per-item errors are reported, valid items are still created
+@router.post("/destinations/batch", response_model=BatchCreateOut)
+async def create_destinations(batch: BatchCreate, db: AsyncSession = Depends(get_async_db)):
+    return await destination_crud.create_destinations(db, batch.items)
+
+# drop-off locations within radius_km of a point, nearest first
+@router.get("/destinations/near", response_model=List[destination_schemas.DestinationNearOut])
+async def read_destinations_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return [
+        destination_schemas.DestinationNearOut(
+            id=destination.id,
+            location_name=destination.location_name,
+            latitude=destination.latitude,
+            longitude=destination.longitude,
+            distance_km=distance,
+        )
+        for destination, distance in await destination_crud.get_destinations_near(db, lat, lon, radius_km, limit)
+    ]
@@ -1,18 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from crud import passenger as passenger_crud
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud_async import passenger as passenger_crud
 from schemas import passenger as passenger_schemas
-from db import get_db
+from schemas.batch import BatchCreate, BatchCreateOut
+from db import get_async_db
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/passengers/", response_model=passenger_schemas.PassengerOut)
-def create_passenger(passenger: passenger_schemas.PassengerCreate, db: Session = Depends(get_db)):
-    return passenger_crud.create_passenger(db, passenger)
+async def create_passenger(passenger: passenger_schemas.PassengerCreate, db: AsyncSession = Depends(get_async_db)):
+    return await passenger_crud.create_passenger(db, passenger)
+
+# create many passengers at once - per-item errors are reported, valid items are still created
+@router.post("/passengers/batch", response_model=BatchCreateOut)
+async def create_passengers(batch: BatchCreate, db: AsyncSession = Depends(get_async_db)):
+    return await passenger_crud.create_passengers(db, batch.items)
 
 @router.get("/passengers/{passenger_id}", response_model=passenger_schemas.PassengerOut)
-def read_passenger(passenger_id: int, db: Session = Depends(get_db)):
-    db_passenger = passenger_crud.get_passenger(db, passenger_id)
+async def read_passenger(passenger_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_passenger = await passenger_crud.get_passenger(db, passenger_id)
     if db_passenger is None:
         raise HTTPException(status_code=404, detail="Passenger not found")
     return db_passenger
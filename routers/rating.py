@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from crud import rating as rating_crud
 from schemas import rating as rating_schemas
 from db import get_db
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/ratings/", response_model=rating_schemas.RatingOut)
 def create_rating(rating: rating_schemas.RatingCreate, db: Session = Depends(get_db)):
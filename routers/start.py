@@ -1,12 +1,35 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from crud import start as start_crud
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud_async import start as start_crud
 from schemas import start as start_schemas
-from db import get_db
+from schemas.batch import BatchCreate, BatchCreateOut
+from db import get_async_db
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/starts/", response_model=start_schemas.StartOut)
-def create_start(start: start_schemas.StartCreate, db: Session = Depends(get_db)):
-    return start_crud.create_start(db, start)
+async def create_start(start: start_schemas.StartCreate, db: AsyncSession = Depends(get_async_db)):
+    return await start_crud.create_start(db, start)
 
+# create many pickup locations at once - per-item errors are reported, valid items are still created
+@router.post("/starts/batch", response_model=BatchCreateOut)
+async def create_starts(batch: BatchCreate, db: AsyncSession = Depends(get_async_db)):
+    return await start_crud.create_starts(db, batch.items)
+
+# pickup locations within radius_km of a point, nearest first
+@router.get("/starts/near", response_model=List[start_schemas.StartNearOut])
+async def read_starts_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return [
+        start_schemas.StartNearOut(
+            id=start.id, location_name=start.location_name, latitude=start.latitude, longitude=start.longitude, distance_km=distance
+        )
+        for start, distance in await start_crud.get_starts_near(db, lat, lon, radius_km, limit)
+    ]
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+import db
+from services.passwords import password_pool
+from services.metrics import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+# connection pool of this worker - checked-out vs idle connections and checkout wait times
+@router.get("/db/pool")
+def read_db_pool():
+    return db.pool_status()
+
+# bcrypt process pool of this worker - hash/verify latency, queue depth, rejections
+@router.get("/password-pool")
+def read_password_pool():
+    return password_pool.stats()
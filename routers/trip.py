@@ -1,172 +1,126 @@
-import torch
-import torch.nn as nn
-import torch.nn.functional as F
-import numpy as np
-from collections import defaultdict
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from transformers import BertTokenizer, BertModel
-from typing import List
+from typing import List, Literal
 from app_models.passenger import Passenger
-from app_models.trip import Trip
-from app_models.user import User
-from app_models.vehicle import Vehicle
-from app_models.rating import Rating
 from schemas import trip as trip_schemas
-from db import get_db
+from schemas.batch import BatchCreate, BatchCreateOut
+from db import get_db, get_async_db
 from crud import trip as trip_crud
+from crud_async import trip as trip_async_crud
+from services.serialization import ORJSONResponse
+from suggestion import sentiment
+from services.metrics import TimedRoute
 
-router = APIRouter()
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-tokenizer = BertTokenizer.from_pretrained('bert-base-uncased') # for tokenizer
-
-# Sentiment Analysis Model
-class Sentiment(nn.Module):
-    def __init__(self):
-        super(Sentiment, self).__init__()
-        self.bert = BertModel.from_pretrained('bert-base-uncased') # extract word embeddings
-        self.lstm = nn.LSTM(768, 128, batch_first=True, bidirectional=True) # 125 hidden units - captures sequential dependencies
-        self.fc = nn.Linear(256, 2) # fully connected layers - 2 classes positive/negative
-    
-    def forward(self, input_ids, attention_mask):
-        with torch.no_grad():
-            embeddings = self.bert(input_ids, attention_mask)[0] # extract embeddings
-        lstm_out, _ = self.lstm(embeddings) # passes embeddings through LSTM
-        out = torch.cat((lstm_out[:, -1, :128], lstm_out[:, 0, 128:]), dim=1) #Concatenates first and last LSTM hidden states
-        return self.fc(out) # output logits
-
-# Load trained model
-model = Sentiment()
-model.load_state_dict(torch.load('./suggestion/bert_lstm_sentiment_model3.pth', map_location=device))
-model.to(device)
-model.eval()
-
-# Sentiment scoring function
-def get_sentiment_score(text):
-    encoded = tokenizer(text, return_tensors='pt', padding=True, truncation=True, max_length=256) #tokenize input
-    input_ids, attention_mask = encoded['input_ids'].to(device), encoded['attention_mask'].to(device) # run sentiment model inference
-    
-    with torch.no_grad():
-        logits = model(input_ids, attention_mask)
-        probs = F.softmax(logits, dim=1)# applies softmax to logits to get probabilities
-    
-    sentiment_score = probs[0][1].item() - probs[0][0].item() # difference between prob to get sentiment score
-    scaled_rating = max(1.0, min(5.0, 1 + 4 * ((sentiment_score + 1) / 2))) # scale 1-5
-    return scaled_rating
+router = APIRouter(route_class=TimedRoute)
 
+# readiness of the sentiment model behind the suggestion ranking - 503 until it is loaded
+@router.get("/suggestion/ready")
+def suggestion_ready():
+    status = sentiment.get_status()
+    return JSONResponse(status, status_code=200 if status["loaded"] else 503)
+
+# load the sentiment model now instead of on the first rating/suggestion that needs it
+@router.post("/suggestion/warmup")
+def suggestion_warmup():
+    if not sentiment.is_enabled():
+        raise HTTPException(status_code=503, detail="Sentiment model is disabled on this worker")
+    return sentiment.warmup()
+
+# one page of trips as a JSON response, with the cursor of the next page in X-Next-Cursor
+# - 400 for a cursor we didn't issue. The rows are plain dicts encoded once by orjson; response_model only documents them.
+def _trip_page(db: Session, params: trip_schemas.TripListParams, page):
+    try:
+        items, next_cursor = page(db, params)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ORJSONResponse(items, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+# trips ranked by driver rating (70% numeric / 30% sentiment), best rated first, a page at a time
 @router.get("/suggestion/", response_model=list[trip_schemas.TripDetailOut])
-def get_all_trips(db: Session = Depends(get_db)):
-    trips_query = (
-        # get all trip details with driver and vehicle details
-        db.query(Trip, User.full_name, User.profile_picture, Vehicle.vehicle_type, Vehicle.image_link) .join(User, Trip.user_id == User.id).join(Vehicle, Trip.vehicle_id == Vehicle.id) .all() )
-    
-    if not trips_query:
-        return []
-    # fetch the ratings of each driver
-    all_ratings = db.query(Rating).all()
-    driver_scores = defaultdict(list)
-    
-    for row in all_ratings:
-        if row.feedback:
-            rating = get_sentiment_score(row.feedback) # compute sentiment score (1-5)
-            driver_scores[row.driver_id].append((row.rating, rating)) # store scores in driver scores dictionary
-    
-    driver_predicted_ratings = {}
-    
-    for d_id, ratings in driver_scores.items():
-        avg_numeric = np.mean([r[0] for r in ratings])
-        avg_sentiment = np.mean([r[1] for r in ratings])
-        # compute 70% numeric and 30% sentiment score
-        driver_predicted_ratings[d_id] = avg_numeric * 0.7 + avg_sentiment * 0.3
-    
-    results = [
-        trip_schemas.TripDetailOut(
-            **trip.__dict__,
-            driver_name=full_name,
-            driver_profile_picture=profile_picture,
-            vehicle_type=vehicle_type,
-            vehicle_image=image_link,
-            driver_overall_rating=driver_predicted_ratings.get(trip.user_id, None)
-        )
-        for trip, full_name, profile_picture, vehicle_type, image_link in trips_query
-    ]
-    
-    return sorted(results, key=lambda x: (-x.driver_overall_rating if x.driver_overall_rating else 0)) # sort descending order
+def get_all_trips(params: trip_schemas.TripListParams = Depends(), db: Session = Depends(get_db)):
+    # get trip details with driver and vehicle details
+    return _trip_page(db, params, trip_crud.get_suggestions)
 
 
+# trips near me - trips with a booked pickup (or drop-off, kind=drop) within radius_km of a point, nearest first
+@router.get("/trips/near", response_model=List[trip_schemas.TripNearOut])
+def get_trips_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100),
+    kind: Literal["pickup", "drop"] = "pickup",
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    return ORJSONResponse(trip_crud.get_trips_near(db, lat, lon, radius_km, kind, limit))
+
 # get all the trips related to a passenger
 @router.get("/trips/rider/{user_id}", response_model=List[trip_schemas.TripDetailOut])
 def get_trips_by_rider(user_id: int, db: Session = Depends(get_db)):
-    #  Find all Passenger records for the given rider (user)
-    passenger_records = db.query(Passenger).filter(Passenger.user_id == user_id).all()
-    if not passenger_records:
+    # unique trip IDs of the Passenger records of the given rider (user)
+    trip_ids = [trip_id for trip_id, in db.query(Passenger.trip_id).filter(Passenger.user_id == user_id).distinct()]
+    if not trip_ids:
         raise HTTPException(status_code=404, detail="No passenger records found for this user.")
-    # Extract unique trip IDs from these passenger records
-    trip_ids = list({record.trip_id for record in passenger_records})
-    # Step 3: Retrieve trip details joined with driver and vehicle information
-    trips_with_details = (
-        db.query(
-            Trip,
-            User.full_name,
-            User.profile_picture,
-            Vehicle.vehicle_type,
-            Vehicle.image_link,
-        )
-        .join(User, Trip.user_id == User.id)
-        .join(Vehicle, Trip.vehicle_id == Vehicle.id)
-        .filter(Trip.id.in_(trip_ids))
-        .all()
-    )   
+    # trip details joined with driver and vehicle information
+    trips_with_details = trip_crud.get_trip_details(db, trip_ids)
     if not trips_with_details:
         raise HTTPException(status_code=404, detail="No trips found for the given passenger records.")
-    # Step 4: Map the results to the TripDetailOut schema
-    results = []
-    for trip, full_name, profile_picture, vehicle_type, image_link in trips_with_details:
-        results.append(
-            trip_schemas.TripDetailOut(
-                **trip.__dict__,
-                driver_name=full_name,
-                driver_profile_picture=profile_picture,
-                vehicle_type=vehicle_type,
-                vehicle_image=image_link,
-            ))
-    return results
+    return ORJSONResponse(trips_with_details)
 
 # Create a new trip
 @router.post("/trips/", response_model=trip_schemas.TripOut)
-def create_trip(trip: trip_schemas.TripCreate, db: Session = Depends(get_db)):
-    return trip_crud.create_trip(db, trip)
+async def create_trip(trip: trip_schemas.TripCreate, db: AsyncSession = Depends(get_async_db)):
+    return await trip_async_crud.create_trip(db, trip)
+
+# create many trips at once (e.g. a recurring ride) - per-item errors are reported, valid items are still created
+@router.post("/trips/batch", response_model=BatchCreateOut)
+async def create_trips(batch: BatchCreate, db: AsyncSession = Depends(get_async_db)):
+    return await trip_async_crud.create_trips(db, batch.items)
 
 # Get a trip by ID
 @router.get("/trips/{trip_id}", response_model=trip_schemas.TripOut)
-def read_trip(trip_id: int, db: Session = Depends(get_db)):
-    db_trip = trip_crud.get_trip(db, trip_id)
+async def read_trip(trip_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_trip = await trip_async_crud.get_trip(db, trip_id)
     if db_trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
     return db_trip
 
 # Get trips by driver ID
 @router.get("/trips/driver/{user_id}", response_model=list[trip_schemas.TripOut])
-def get_trips_by_driver(user_id: int, db: Session = Depends(get_db)):
-    return trip_crud.get_trips_by_driver(db, user_id)
+async def get_trips_by_driver(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await trip_async_crud.get_trips_by_driver(db, user_id)
 
+# list trips a page at a time, ordered by date - pass the X-Next-Cursor response header back as ?cursor= for the next page
 @router.get("/trips/", response_model=list[trip_schemas.TripDetailOut])
-def get_all_trips(db: Session = Depends(get_db)):
-    trips = trip_crud.get_all_trips(db)
-    return trips
-
-# Update the seat availaibility
-@router.put("/trips/seats/{trip_id}", response_model=trip_schemas.TripOut)
-def update_trip_seats(trip_id: int, seat_update: trip_schemas.TripSeatUpdate, db: Session = Depends(get_db)):
-    db_trip = trip_crud.update_seat_availability(db, trip_id, seat_update.seats_available)
-    if not db_trip:
-        raise HTTPException(status_code=404, detail="Trip not found")
-    return db_trip
+def get_all_trips(params: trip_schemas.TripListParams = Depends(), db: Session = Depends(get_db)):
+    return _trip_page(db, params, trip_crud.get_all_trips)
+
+# reserve seats atomically - 409 when not enough are left
+@router.post("/trips/{trip_id}/reserve", response_model=trip_schemas.TripSeatReservationOut)
+async def reserve_trip_seats(trip_id: int, reservation: trip_schemas.TripSeatReservation, db: AsyncSession = Depends(get_async_db)):
+    reserved, seats_left = await trip_async_crud.reserve_seats(db, trip_id, reservation.seats)
+    if not reserved:
+        if await trip_async_crud.get_trip(db, trip_id) is None:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        raise HTTPException(status_code=409, detail="Not enough seats available")
+    return {"trip_id": trip_id, "seats": reservation.seats, "seats_available": seats_left}
+
+# release previously reserved seats - 409 if that would exceed the vehicle's seats
+@router.post("/trips/{trip_id}/release", response_model=trip_schemas.TripSeatReservationOut)
+async def release_trip_seats(trip_id: int, reservation: trip_schemas.TripSeatReservation, db: AsyncSession = Depends(get_async_db)):
+    released, seats_left = await trip_async_crud.release_seats(db, trip_id, reservation.seats)
+    if not released:
+        if await trip_async_crud.get_trip(db, trip_id) is None:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        raise HTTPException(status_code=409, detail="Cannot release more seats than the vehicle has")
+    return {"trip_id": trip_id, "seats": reservation.seats, "seats_available": seats_left}
 
 # Update a trip
 @router.put("/trips/{trip_id}", response_model=trip_schemas.TripOut)
-def update_trip(trip_id: int, trip_update: trip_schemas.TripUpdate, db: Session = Depends(get_db)):
-    db_trip = trip_crud.update_trip(db, trip_id, trip_update)
+async def update_trip(trip_id: int, trip_update: trip_schemas.TripUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_trip = await trip_async_crud.update_trip(db, trip_id, trip_update)
     if db_trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
     return db_trip
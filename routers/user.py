@@ -1,39 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from crud import user as user_crud
+from crud_async import user as user_async_crud
 from schemas import user as user_schemas
-from db import get_db # import for database session
+from db import get_db, get_async_db # import for database session
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.passwords import password_pool, PasswordPoolBusy, PasswordPoolTimeout
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
+
+# run a bcrypt call on the password pool; 503 when it is saturated so clients back off
+async def _password_call(call, *args):
+    try:
+        return await call(*args)
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    except PasswordPoolTimeout:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Password check timed out, please retry")
 
 # Utility function to verify password
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    return await _password_call(password_pool.verify, plain_password, hashed_password)
 
 # Login route
 @router.post("/login/")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     # Get user by email (username in form_data)
-    user = user_crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.password):
+    user = await user_async_crud.get_user_by_email(db, email=form_data.username)
+    if not user or not await verify_password(form_data.password, user.password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect email or password")
     # Return required user details
     return {"id": user.id,"full_name": user.full_name,"is_driver": user.is_driver }
 
 # Register a new user
 @router.post("/users/", response_model=user_schemas.UserOut, status_code=status.HTTP_201_CREATED)
-def create_user(user: user_schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: user_schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if a user with this email already exists
-    db_user = user_crud.get_user_by_email(db, email=user.email)
+    db_user = await user_async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         # Check if the existing user is a driver or rider
         user_type = "Driver" if db_user.is_driver else "Rider"
         raise HTTPException(  status_code=status.HTTP_400_BAD_REQUEST, detail=f"Email already registered with a {user_type} account." )
     # If email is not registered, create a new user
-    return user_crud.create_user(db=db, user=user)
+    hashed_password = await _password_call(password_pool.hash, user.password)
+    return await user_async_crud.create_user(db=db, user=user, hashed_password=hashed_password)
 
 # Get a user by ID
 @router.get("/users/{user_id}", response_model=user_schemas.UserOut)
@@ -42,4 +54,3 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
-
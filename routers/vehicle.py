@@ -1,23 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException 
-from sqlalchemy.orm import Session
-from crud import vehicle as vehicle_crud
+from sqlalchemy.ext.asyncio import AsyncSession
+from crud_async import vehicle as vehicle_crud
 from schemas import vehicle as vehicle_schemas
-from db import get_db
+from db import get_async_db
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/vehicles/", response_model=vehicle_schemas.VehicleOut)
-async def create_vehicle(vehicle: vehicle_schemas.VehicleCreate, db: Session = Depends(get_db)):
-    db_vehicle = vehicle_crud.create_vehicle(db, vehicle)
+async def create_vehicle(vehicle: vehicle_schemas.VehicleCreate, db: AsyncSession = Depends(get_async_db)):
+    db_vehicle = await vehicle_crud.create_vehicle(db, vehicle)
     return db_vehicle
 
 @router.get("/vehicles/{vehicle_id}", response_model=vehicle_schemas.VehicleOut)
-def read_vehicle(vehicle_id: int, db: Session = Depends(get_db)):
-    db_vehicle = vehicle_crud.get_vehicle(db, vehicle_id)
+async def read_vehicle(vehicle_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_vehicle = await vehicle_crud.get_vehicle(db, vehicle_id)
     if db_vehicle is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return db_vehicle
 
 @router.get("/vehicles/user/{user_id}", response_model=list[vehicle_schemas.VehicleOut])
-def read_vehicles_by_user(user_id: int, db: Session = Depends(get_db)):
-    return vehicle_crud.get_vehicles_by_user(db, user_id)
\ No newline at end of file
+async def read_vehicles_by_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await vehicle_crud.get_vehicles_by_user(db, user_id)
\ No newline at end of file
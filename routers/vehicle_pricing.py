@@ -3,10 +3,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from db import get_db
 from crud import vehicle_pricing as vehicle_pricing_crud
-from schemas.vehicle_pricing import VehiclePricingCreate, VehiclePricingOut
+from schemas.vehicle_pricing import VehiclePricingCreate, VehiclePricingOut, FareQuoteRequest, FareQuoteOut
 from typing import List
+from services.metrics import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 @router.post("/vehicle_pricing/", response_model=VehiclePricingOut)
 def create_vehicle_pricing(vehicle_pricing: VehiclePricingCreate, db: Session = Depends(get_db)):
@@ -17,4 +18,9 @@ def create_vehicle_pricing(vehicle_pricing: VehiclePricingCreate, db: Session =
 
 @router.get("/vehicle_pricings/", response_model=List[VehiclePricingOut])
 def read_vehicle_pricings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return vehicle_pricing_crud.get_vehicle_pricings(db, skip=skip, limit=limit)
\ No newline at end of file
+    return vehicle_pricing_crud.get_vehicle_pricings(db, skip=skip, limit=limit)
+
+# price many trips at once (e.g. every trip visible on the map) from the vehicle pricing rates
+@router.post("/fare_quotes/", response_model=List[FareQuoteOut])
+def quote_fares(request: FareQuoteRequest, db: Session = Depends(get_db)):
+    return vehicle_pricing_crud.quote_fares(db, request.quotes)
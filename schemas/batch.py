@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+# batch create request - items are validated one by one, so one bad item doesn't reject the others
+class BatchCreate(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., max_length=1000)
+
+class BatchItemError(BaseModel):
+    index: int  # position of the item in the request
+    errors: List[Dict[str, Any]]  # loc / msg / type, like a 422 response
+
+class BatchCreateOut(BaseModel):
+    ids: List[Optional[int]]  # id of each item, in request order; None for rejected items
+    created: int
+    errors: List[BatchItemError]
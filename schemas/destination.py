@@ -12,4 +12,7 @@ class DestinationOut(DestinationBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class DestinationNearOut(DestinationOut):
+    distance_km: float
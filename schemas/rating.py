@@ -13,6 +13,7 @@ class RatingCreate(RatingBase):
 
 class RatingOut(RatingBase):
     id: int
+    sentiment_score: Optional[float] = None
 
     class Config:
         orm_mode = True  # Enables ORM compatibility for SQLAlchemy models
\ No newline at end of file
@@ -12,4 +12,7 @@ class StartOut(StartBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class StartNearOut(StartOut):
+    distance_km: float
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -39,5 +39,24 @@ class TripDetailOut(TripOut):
     vehicle_image: Optional[str]
     driver_overall_rating: Optional[float] = None
 
-class TripSeatUpdate(BaseModel):
-    seats_available: int
\ No newline at end of file
+class TripNearOut(TripDetailOut):
+    distance_km: float  # to the nearest booked pickup / drop-off of the trip
+
+# query parameters of the trip listings - filters plus keyset pagination on (date, id)
+class TripListParams(BaseModel):
+    cursor: Optional[str] = None  # X-Next-Cursor header of the previous page
+    limit: int = Field(50, ge=1, le=200)
+    status: Optional[str] = None
+    active_only: bool = False  # skip completed and canceled trips
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    min_seats: Optional[int] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+
+class TripSeatReservation(BaseModel):
+    seats: int = Field(1, ge=1)
+
+class TripSeatReservationOut(BaseModel):
+    trip_id: int
+    seats: int
+    seats_available: Optional[int] = None  # left after the change, when the database can return it in the same statement
@@ -1,5 +1,6 @@
 # schemas/vehicle_pricing.py
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 class VehiclePricingBase(BaseModel):
     vehicle_type: str
@@ -12,4 +13,18 @@ class VehiclePricingOut(VehiclePricingBase):
     id: int
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class FareQuoteItem(BaseModel):
+    origin_lat: float = Field(..., ge=-90, le=90)
+    origin_lon: float = Field(..., ge=-180, le=180)
+    dest_lat: float = Field(..., ge=-90, le=90)
+    dest_lon: float = Field(..., ge=-180, le=180)
+    vehicle_type: str
+
+class FareQuoteRequest(BaseModel):
+    quotes: List[FareQuoteItem] = Field(..., max_length=10000)
+
+class FareQuoteOut(BaseModel):
+    distance_km: float  # straight-line (haversine) distance
+    fare: Optional[float] = None  # None when the vehicle type has no pricing
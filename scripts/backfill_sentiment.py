@@ -0,0 +1,31 @@
+"""Backfill stored sentiment scores for existing ratings.
+
+    python -m scripts.backfill_sentiment            # score ratings that have no stored score
+    python -m scripts.backfill_sentiment --rescore  # also rescore rows scored by an older model file
+
+Needs migration 0002 (python -m migrations upgrade) on databases created before scores were stored.
+"""
+import argparse
+import time
+from db import SessionLocal
+from crud import rating as rating_crud
+from suggestion import sentiment
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute and store sentiment scores for ratings feedback")
+    parser.add_argument("--rescore", action="store_true", help="rescore rows scored by a different model file")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        scored = rating_crud.score_ratings(db, rescore=args.rescore, batch_size=args.batch_size)
+    finally:
+        db.close()
+        sentiment.cache.save()
+    elapsed = time.perf_counter() - started
+    print(f"scored {scored} ratings in {elapsed:.1f}s ({scored / elapsed if elapsed else 0:.1f} reviews/s)")
+
+if __name__ == "__main__":
+    main()
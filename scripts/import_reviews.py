@@ -0,0 +1,96 @@
+"""Stream historical reviews from a CSV export into the ratings table.
+
+    python -m scripts.import_reviews suggestion/uber_reviews_without_reviewid.csv --trip-id 1 --rated-by-user-id 1
+    python -m scripts.import_reviews reviews.csv --chunk-size 5000 --score-sentiment
+    python -m scripts.import_reviews reviews.csv --start-row 200000   # resume after the last reported row
+
+The file is read a chunk at a time. Each chunk becomes one executemany INSERT and one transaction, so memory
+stays flat whatever the file size. The stars come from --rating-column and the feedback from --feedback-column.
+trip_id, rated_by_user_id and driver_id come from CSV columns of those names when present, otherwise from the
+matching options. Rows without a valid 1-5 rating are skipped. With --score-sentiment the feedback is scored in
+batches during the import. Without it, the scores stay empty until scripts.backfill_sentiment runs.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from itertools import islice
+from db import SessionLocal
+from app_models import user, trip  # noqa: F401 - tables the ratings foreign keys point at
+from crud import rating as rating_crud
+from suggestion import sentiment
+
+FEEDBACK_LENGTH = 255  # ratings.feedback is VARCHAR(255)
+
+# CSV row -> dict of Rating columns, or None for a row without a usable rating
+def to_rating(row, args):
+    try:
+        stars = int(float(row[args.rating_column]))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not 1 <= stars <= 5:
+        return None
+    feedback = (row.get(args.feedback_column) or "").strip()
+    rating = {"rating": stars, "feedback": feedback[:FEEDBACK_LENGTH] or None}
+    for column in ("trip_id", "rated_by_user_id", "driver_id"):
+        value = row.get(column) or getattr(args, column)
+        rating[column] = int(value) if value not in (None, "") else None
+    if rating["trip_id"] is None or rating["rated_by_user_id"] is None:
+        return None
+    return rating
+
+def chunks(reader, size):
+    while True:
+        chunk = list(islice(reader, size))
+        if not chunk:
+            return
+        yield chunk
+
+def main():
+    parser = argparse.ArgumentParser(description="Import reviews from a CSV file into ratings")
+    parser.add_argument("path", help="CSV file with a header row")
+    parser.add_argument("--rating-column", default="score")
+    parser.add_argument("--feedback-column", default="content")
+    parser.add_argument("--trip-id", type=int, help="trip of every review, unless the CSV has a trip_id column")
+    parser.add_argument("--rated-by-user-id", type=int, help="author of every review, unless the CSV has a rated_by_user_id column")
+    parser.add_argument("--driver-id", type=int, help="driver of every review, unless the CSV has a driver_id column")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows per INSERT/transaction")
+    parser.add_argument("--start-row", type=int, default=0, help="skip this many data rows first (resume)")
+    parser.add_argument("--score-sentiment", action="store_true", help="score feedback with the sentiment model while importing")
+    parser.add_argument("--batch-size", type=int, help="sentiment inference batch size (default: SENTIMENT_BATCH_SIZE)")
+    args = parser.parse_args()
+    if args.score_sentiment and not sentiment.is_enabled():
+        parser.error("--score-sentiment needs the sentiment model (SENTIMENT_ENABLED=true)")
+
+    total_bytes = os.path.getsize(args.path)
+    imported = skipped = 0
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(args.path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for _ in islice(reader, args.start_row):
+                pass
+            row_number = args.start_row
+            for chunk in chunks(reader, args.chunk_size):
+                row_number += len(chunk)
+                ratings = [rating for rating in (to_rating(row, args) for row in chunk) if rating is not None]
+                skipped += len(chunk) - len(ratings)
+                imported += rating_crud.bulk_create_ratings(db, ratings, args.score_sentiment, args.batch_size)
+                db.expunge_all()
+                elapsed = time.perf_counter() - started
+                print(
+                    f"row {row_number}: {imported} imported, {skipped} skipped, "
+                    f"{imported / elapsed if elapsed else 0:.0f} rows/s, {f.buffer.tell() / total_bytes:.0%} of file",
+                    file=sys.stderr,
+                )
+    finally:
+        db.close()
+        if args.score_sentiment:
+            sentiment.cache.save()
+    elapsed = time.perf_counter() - started
+    print(f"imported {imported} ratings ({skipped} skipped) in {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Recompute the driver_rating_stats running totals from the ratings table.
+
+    python -m scripts.rebuild_driver_stats          # rebuild from scratch
+    python -m scripts.rebuild_driver_stats --check  # only report drivers whose totals have drifted
+"""
+import argparse
+import sys
+from db import SessionLocal
+from crud import rating as rating_crud
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check per-driver rating totals")
+    parser.add_argument("--check", action="store_true", help="compare stored totals with the ratings table without changing them")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            mismatched = rating_crud.check_driver_stats(db)
+            if mismatched:
+                print(f"{len(mismatched)} drivers out of sync: {mismatched}")
+                sys.exit(1)
+            print("driver rating stats are consistent")
+        else:
+            rating_crud.rebuild_driver_stats(db)
+            print("driver rating stats rebuilt")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
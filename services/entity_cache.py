@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+import config
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from app_models.vehicle_pricing import VehiclePricing
+
+_MISSING = object()
+
+# Size-bounded LRU with a per-entry time to live
+class TTLCache:
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+# Process-local read-through cache of one model's rows, looked up by a column (the primary key by default).
+# Column values are cached, not ORM objects, and handed back merged into the caller's session without a query.
+# Columns in exclude (secrets such as password hashes) are never cached; they load from the database when read.
+class EntityCache:
+    def __init__(self, model, key_column=None, max_entries=None, ttl_seconds=None, exclude=()):
+        self.model = model
+        self.key_column = key_column if key_column is not None else inspect(model).primary_key[0]
+        self.cache = TTLCache(
+            max_entries or config.ENTITY_CACHE_MAX_ENTRIES,
+            config.ENTITY_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds,
+        )
+        self._primary_key = [column.key for column in inspect(model).primary_key]
+        self._columns = [attr.key for attr in inspect(model).column_attrs if attr.key not in exclude]
+
+    def _snapshot(self, obj):
+        return {column: getattr(obj, column) for column in self._columns}
+
+    def get(self, db: Session, key):
+        snapshot = self.cache.get(key, _MISSING)
+        if snapshot is _MISSING:
+            obj = db.query(self.model).filter(self.key_column == key).first()
+            if obj is not None:
+                self.cache.set(key, self._snapshot(obj))
+            return obj
+        # the session's own copy may hold newer or pending changes - never overwrite it with the snapshot
+        current = db.identity_map.get(identity_key(self.model, tuple(snapshot[column] for column in self._primary_key)))
+        if current is not None:
+            return current
+        instance = self.model(**snapshot)
+        make_transient_to_detached(instance)
+        return db.merge(instance, load=False)
+
+    # column values for many keys - cached ones from memory, the rest in one IN query; unknown keys are left out
+    def get_many(self, db: Session, keys):
+        found, missing = {}, []
+        for key in set(keys):
+            snapshot = self.cache.get(key, _MISSING)
+            if snapshot is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = snapshot
+        if missing:
+            for obj in db.query(self.model).filter(self.key_column.in_(missing)).all():
+                snapshot = self._snapshot(obj)
+                key = snapshot[self.key_column.key]
+                self.cache.set(key, snapshot)
+                found[key] = snapshot
+        return found
+
+    def invalidate(self, key):
+        self.cache.invalidate(key)
+
+user_cache = EntityCache(User, exclude=("password",))
+vehicle_cache = EntityCache(Vehicle)
+vehicle_pricing_cache = EntityCache(VehiclePricing, key_column=VehiclePricing.vehicle_type)
+
+def stats():
+    return {
+        "users": user_cache.cache.stats(),
+        "vehicles": vehicle_cache.cache.stats(),
+        "vehicle_pricings": vehicle_pricing_cache.cache.stats(),
+    }
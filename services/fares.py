@@ -0,0 +1,45 @@
+import threading
+import time
+import numpy as np
+from sqlalchemy.orm import Session
+import config
+from app_models.vehicle_pricing import VehiclePricing
+from services.geo_index import EARTH_RADIUS_KM
+
+# great-circle distances in km between arrays of points, in one vectorized pass
+def haversine_km(origin_lat, origin_lon, dest_lat, dest_lon):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (origin_lat, origin_lon, dest_lat, dest_lon))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+# In-memory copy of the vehicle_pricings table, reloaded after crud changes it or every PRICING_TABLE_TTL_SECONDS
+# (so prices changed by another worker are picked up)
+class PricingTable:
+    def __init__(self, ttl_seconds=None):
+        self.ttl_seconds = config.PRICING_TABLE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._rates = None  # vehicle_type -> rate_per_km
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._rates = None
+
+    def rates(self, db: Session):
+        with self._lock:
+            if self._rates is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+                self._rates = dict(db.query(VehiclePricing.vehicle_type, VehiclePricing.rate_per_km).all())
+                self._loaded_at = time.monotonic()
+            return self._rates
+
+    # distances (km) and fares for many trips at once; fare is NaN where the vehicle type has no pricing
+    def quote(self, db: Session, origin_lat, origin_lon, dest_lat, dest_lon, vehicle_types):
+        rates = self.rates(db)
+        distance_km = haversine_km(origin_lat, origin_lon, dest_lat, dest_lon)
+        # look each distinct vehicle type up once, then broadcast the rates back to every quote
+        types, inverse = np.unique(np.asarray(vehicle_types, dtype=object).astype(str), return_inverse=True)
+        type_rates = np.array([rates.get(vehicle_type, np.nan) for vehicle_type in types], dtype=np.float64)
+        fares = np.round(distance_km * type_rates[inverse.reshape(-1)], 2)
+        return distance_km, fares
+
+pricing_table = PricingTable()
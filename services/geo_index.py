@@ -0,0 +1,111 @@
+import math
+import threading
+from collections import defaultdict
+from sqlalchemy.orm import Session
+import config
+from app_models.start import Start
+from app_models.destination import Destination
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # length of one degree of latitude
+
+# great-circle distance between two points in km
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+# Points bucketed into fixed lat/lon grid cells; a radius query only visits the cells overlapping its bounding box
+class GridIndex:
+    def __init__(self, cell_deg=0.01):
+        self.cell_deg = cell_deg
+        self.lon_cells = max(1, round(360 / cell_deg))
+        self._cells = defaultdict(list)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor((lon + 180) / self.cell_deg) % self.lon_cells
+
+    def add(self, point_id, lat, lon):
+        self._cells[self._cell(lat, lon)].append((point_id, lat, lon))
+        self._size += 1
+
+    # (id, distance_km) of every point within radius_km, nearest first
+    def within(self, lat, lon, radius_km):
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(89.9, abs(lat) + lat_span)))
+        lon_span = min(180.0, lat_span / max(cos_lat, 1e-6))
+        row_lo, _ = self._cell(lat - lat_span, lon)
+        row_hi, _ = self._cell(lat + lat_span, lon)
+        _, col = self._cell(lat, lon)
+        col_reach = math.ceil(lon_span / self.cell_deg)
+        cols = range(self.lon_cells) if 2 * col_reach + 1 >= self.lon_cells else [
+            (col + offset) % self.lon_cells for offset in range(-col_reach, col_reach + 1)
+        ]
+
+        # a huge radius over a sparse index is cheaper to answer from the occupied cells
+        if (row_hi - row_lo + 1) * len(cols) > len(self._cells):
+            wanted_cols = set(cols)
+            buckets = [points for (row, c), points in self._cells.items() if row_lo <= row <= row_hi and c in wanted_cols]
+        else:
+            buckets = [self._cells[(row, c)] for row in range(row_lo, row_hi + 1) for c in cols if (row, c) in self._cells]
+
+        matches = []
+        for points in buckets:
+            for point_id, point_lat, point_lon in points:
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    matches.append((point_id, distance))
+        return sorted(matches, key=lambda match: match[1])
+
+# Grid index over a location table (start / destinations), built from the database on first use.
+# crud adds rows as it creates them; rows inserted by other workers are picked up by id before each search.
+class LocationIndex:
+    # ids are re-checked this far below the highest one loaded, for inserts that committed out of id order
+    REFRESH_LOOKBACK = 100
+
+    def __init__(self, model, cell_deg=None):
+        self.model = model
+        self.cell_deg = cell_deg or config.GEO_INDEX_CELL_DEG
+        self._grid = GridIndex(self.cell_deg)
+        self._ids = set()
+        self._max_id = 0  # highest id loaded by refresh
+        self._lock = threading.Lock()
+
+    def add(self, location_id, lat, lon):
+        if lat is None or lon is None:
+            return
+        with self._lock:
+            if location_id not in self._ids:
+                self._grid.add(location_id, lat, lon)
+                self._ids.add(location_id)
+
+    # load rows above the highest id seen (the whole table on first call) - a primary key range scan
+    def refresh(self, db: Session):
+        model = self.model
+        rows = (
+            db.query(model.id, model.latitude, model.longitude)
+            .filter(model.id > self._max_id - self.REFRESH_LOOKBACK, model.latitude.isnot(None), model.longitude.isnot(None))
+            .all()
+        )
+        for location_id, lat, lon in rows:
+            self.add(location_id, lat, lon)
+        if rows:
+            self._max_id = max(self._max_id, max(row[0] for row in rows))
+
+    def within(self, db: Session, lat, lon, radius_km):
+        self.refresh(db)
+        with self._lock:
+            return self._grid.within(lat, lon, radius_km)
+
+    def reset(self):
+        with self._lock:
+            self._grid = GridIndex(self.cell_deg)
+            self._ids.clear()
+            self._max_id = 0
+
+start_index = LocationIndex(Start)
+destination_index = LocationIndex(Destination)
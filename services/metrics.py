@@ -0,0 +1,225 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+
+# Request metrics in Prometheus text format (no client library): per-route latency histograms and status counts,
+# SQL query counts/time, and a Server-Timing header that splits each response into db / inference / serialization.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+UNMATCHED_ROUTE = "unmatched"  # 404s etc. share one label so arbitrary paths can't grow the series count
+
+_registry = []
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labelnames, key)} {value:g}"
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', f'{bound:g}')])} {count}"
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', '+Inf')])} {series[-2]}"
+                yield f"{self.name}_count{_labels(self.labelnames, key)} {series[-2]}"
+                yield f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]:g}"
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+route_db_queries = Counter("http_request_db_queries_total", "SQL statements executed while serving each route", ("route",))
+route_db_seconds = Counter("http_request_db_seconds_total", "Time spent in SQL statements while serving each route", ("route",))
+route_inference_seconds = Counter("http_request_inference_seconds_total", "Time spent in sentiment model inference while serving each route", ("route",))
+route_serialization_seconds = Counter("http_request_serialization_seconds_total", "Time spent validating and encoding responses of each route", ("route",))
+db_queries = Counter("db_queries_total", "SQL statements executed, by statement type", ("statement",))
+db_latency = Histogram("db_query_duration_seconds", "SQL statement latency, by statement type", ("statement",), QUERY_BUCKETS)
+
+# time spent on the current request, shared by the middleware, the engine event hooks and the route handler
+class RequestTimings:
+    __slots__ = ("db_seconds", "db_queries", "inference_seconds", "serialization_seconds", "endpoint_finished")
+
+    def __init__(self):
+        self.db_seconds = self.inference_seconds = self.serialization_seconds = 0.0
+        self.db_queries = 0
+        self.endpoint_finished = None
+
+    def server_timing(self, total_seconds):
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_queries} queries", '
+            f"inference;dur={self.inference_seconds * 1000:.2f}, "
+            f"serialization;dur={self.serialization_seconds * 1000:.2f}, "
+            f"total;dur={total_seconds * 1000:.2f}"
+        )
+
+# contextvars follow the request into the threadpool (sync routes) and the async engine's greenlets
+_current = ContextVar("request_timings", default=None)
+
+def current_timings():
+    return _current.get()
+
+# add the time spent in the block to a phase of the current request, e.g. with phase("inference"): ...
+@contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current.get()
+        if timings is not None:
+            setattr(timings, f"{name}_seconds", getattr(timings, f"{name}_seconds") + time.perf_counter() - started)
+
+# one SQL statement, from the engine event hooks in db.py
+def record_query(statement, seconds):
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    db_queries.inc(statement=kind)
+    db_latency.observe(seconds, statement=kind)
+    timings = _current.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += seconds
+
+# route template of the request, e.g. /trips/trips/{trip_id}. route.path may be relative to the router the route
+# was declared on (newer FastAPI keeps included routers separate), so the prefix it was matched under is put back.
+def _route_label(scope):
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    try:
+        matched = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return getattr(route, "path", UNMATCHED_ROUTE)
+    path = scope["path"]
+    prefix = path[:-len(matched)] if matched and path.endswith(matched) else ""
+    return prefix + route.path
+
+# ASGI middleware: latency histogram and status counter per route template, Server-Timing header on every response
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            route, method = _route_label(scope), scope["method"]
+            http_requests.inc(method=method, route=route, status=str(status))
+            http_latency.observe(elapsed, method=method, route=route)
+            if timings.db_queries:
+                route_db_queries.inc(timings.db_queries, route=route)
+                route_db_seconds.inc(timings.db_seconds, route=route)
+            if timings.inference_seconds:
+                route_inference_seconds.inc(timings.inference_seconds, route=route)
+            if timings.serialization_seconds:
+                route_serialization_seconds.inc(timings.serialization_seconds, route=route)
+            _current.reset(token)
+
+def _mark_endpoint_finished():
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_finished = time.perf_counter()
+
+def _timed_endpoint(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_finished()
+    return timed
+
+# route class for the routers: time between the endpoint returning and the response being ready counts as
+# serialization (response_model validation and JSON encoding). Use as APIRouter(route_class=TimedRoute).
+class TimedRoute(APIRoute):
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_finished is not None:
+                timings.serialization_seconds += time.perf_counter() - timings.endpoint_finished
+            return response
+        return timed_handler
+
+def gauge_lines(name, documentation, value):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+
+# every registered metric in Prometheus text exposition format, plus extra pre-rendered lines
+def render(extra_lines=()):
+    lines = [line for metric in _registry for line in metric.lines()]
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
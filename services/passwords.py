@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+import config
+
+# bcrypt with a configurable cost factor - each +1 round doubles the time per hash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+class PasswordPoolBusy(RuntimeError):
+    pass
+
+class PasswordPoolTimeout(RuntimeError):
+    pass
+
+# Runs bcrypt on a dedicated, size-limited process pool so a burst of logins can't starve the request threads.
+# Callers beyond max_pending are turned away immediately instead of queueing without bound.
+class PasswordPool:
+    def __init__(self, workers=None, max_pending=None, timeout_seconds=None):
+        self.workers = workers or config.PASSWORD_POOL_WORKERS
+        self.max_pending = max_pending or config.PASSWORD_POOL_MAX_PENDING
+        self.timeout_seconds = timeout_seconds or config.PASSWORD_HASH_TIMEOUT
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._latencies = deque(maxlen=1000)  # seconds, most recent calls
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    # the pending slot is held until the job leaves the worker process - a timed-out caller stops waiting, bcrypt doesn't
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy("too many password operations queued")
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordPoolTimeout(f"password operation took longer than {self.timeout_seconds}s")
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+            self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    # latency (queue wait + hashing) of recent completed calls and pool pressure
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+
+        def percentile(q):
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2) if latencies else None
+
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": config.BCRYPT_ROUNDS,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_pool = PasswordPool()
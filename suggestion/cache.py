@@ -0,0 +1,93 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# normalize feedback the way the uncased tokenizer sees it, so "Good", "good " and "GOOD" share one entry
+def normalize(text):
+    return " ".join(text.lower().split())
+
+# Bounded LRU cache of sentiment scores keyed on a hash of the normalized text and the model version,
+# optionally persisted to a JSON file so warm scores survive restarts
+class SentimentCache:
+    def __init__(self, max_entries=10000, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(text, model_version):
+        return hashlib.sha1(f"{model_version}\0{normalize(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def set(self, key, score):
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False) # evict least recently used
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            self._dirty = True
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    # entries are stored oldest first so reloading keeps the LRU order
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("ignoring unreadable sentiment cache file %s: %s", self.path, exc)
+            return
+        with self._lock:
+            for key, score in entries[-self.max_entries:]:
+                self._entries[key] = score
+
+    # write atomically so a crash mid-save never leaves a truncated file behind
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._entries.items())
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
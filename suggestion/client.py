@@ -0,0 +1,91 @@
+import socket
+import struct
+import threading
+import orjson
+
+# Client side of the sentiment model server (suggestion/server.py). Messages are orjson objects, each framed by its
+# length as a 4-byte big-endian integer, over a Unix socket. API workers keep one connection per thread.
+
+_HEADER = struct.Struct(">I")
+
+class SentimentServerUnavailable(RuntimeError):
+    pass
+
+class SentimentServerError(RuntimeError):
+    pass
+
+def send_message(sock, message):
+    payload = orjson.dumps(message)
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def _recv_exact(sock, size):
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            raise ConnectionResetError("connection closed by peer")
+        chunks += chunk
+    return bytes(chunks)
+
+# next message on the socket, None on a clean close between messages
+def recv_message(sock):
+    header = sock.recv(_HEADER.size, socket.MSG_WAITALL)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        header += _recv_exact(sock, _HEADER.size - len(header))
+    (size,) = _HEADER.unpack(header)
+    return orjson.loads(_recv_exact(sock, size))
+
+class SentimentClient:
+    def __init__(self, socket_path, timeout_seconds):
+        self.socket_path = socket_path
+        self.timeout_seconds = timeout_seconds
+        self._local = threading.local()
+        self.model_version = None  # as last reported by the server; it changes when the server restarts with another model
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_seconds)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as exc:
+            sock.close()
+            raise SentimentServerUnavailable(f"sentiment server not reachable at {self.socket_path}: {exc}") from exc
+        self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            self._local.sock = None
+            sock.close()
+
+    # one request/response; a connection dropped by a server restart is reopened once
+    def call(self, message):
+        for attempt in (1, 2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                send_message(sock, message)
+                response = recv_message(sock)
+                if response is None:
+                    raise ConnectionResetError("connection closed by peer")
+                break
+            except socket.timeout as exc:
+                self._close()
+                raise SentimentServerUnavailable(f"sentiment server did not answer within {self.timeout_seconds}s") from exc
+            except OSError as exc:
+                self._close()
+                if attempt == 2:
+                    raise SentimentServerUnavailable(f"sentiment server connection failed: {exc}") from exc
+        if "error" in response:
+            raise SentimentServerError(response["error"])
+        if "model_version" in response:
+            self.model_version = response["model_version"]
+        return response
+
+    def infer(self, texts):
+        return self.call({"op": "infer", "texts": texts})["scores"]
+
+    def status(self):
+        return self.call({"op": "status"})
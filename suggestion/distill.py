@@ -0,0 +1,121 @@
+"""Distill the BERT sentiment model into the fast-path scorer.
+
+    python -m suggestion.distill
+    python -m suggestion.distill --limit 4000 --holdout 0.2
+
+Scores the reviews in suggestion/uber_reviews_without_reviewid.csv with the BERT model (the teacher) and fits TF-IDF
+(word 1-2 grams) + logistic regression to its P(positive). Each review is used twice, as positive with weight p and as
+negative with weight 1 - p, so the student learns BERT's soft scores rather than the star ratings. A held-out split
+shows, per confidence threshold, how much traffic the student would answer and how close it stays to BERT there.
+
+Writes SENTIMENT_FAST_PATH_MODEL_PATH (joblib); workers pick it up on their next start. Teacher scores go through the
+sentiment score cache, so with SENTIMENT_CACHE_PATH set a rerun doesn't score the reviews again.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import numpy as np
+import config
+from suggestion import sentiment
+from suggestion.cache import normalize
+
+REVIEWS_CSV = os.path.join(config.BASE_DIR, "suggestion", "uber_reviews_without_reviewid.csv")
+THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+def log(message):
+    print(message, file=sys.stderr)
+
+# distinct normalized review texts, cut to the 255 characters a rating's feedback can hold
+def load_texts(path=REVIEWS_CSV, limit=None):
+    texts = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            text = normalize(row["content"] or "")[:255]
+            if text:
+                texts.setdefault(text, None)
+                if limit and len(texts) >= limit:
+                    break
+    return list(texts)
+
+def teacher_scores(texts, batch_size, log=print):
+    scores = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), 512):
+        scores.extend(sentiment.get_sentiment_scores(texts[start:start + 512], batch_size))
+        log(f"teacher scored {len(scores)}/{len(texts)} ({time.perf_counter() - started:.0f}s)")
+    return scores
+
+def fit(texts, probs):
+    from scipy.sparse import vstack
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=2, sublinear_tf=True)
+    features = vectorizer.fit_transform(texts)
+    n = features.shape[0]
+    # soft labels: every text as positive (weight p) and as negative (weight 1 - p)
+    classifier = LogisticRegression(C=4.0, max_iter=2000)
+    classifier.fit(vstack([features, features]), np.r_[np.ones(n), np.zeros(n)], sample_weight=np.r_[probs, 1 - probs])
+    return vectorizer, classifier
+
+# coverage and agreement with the teacher on held-out texts, per confidence threshold
+def evaluate(scorer, texts, probs):
+    started = time.perf_counter()
+    student, known = scorer.probabilities(texts)
+    elapsed = time.perf_counter() - started
+    report = {"texts": len(texts), "student_ms_per_text": round(elapsed * 1000 / len(texts), 4), "thresholds": {}}
+    for threshold in THRESHOLDS:
+        confident = known & (np.abs(2 * student - 1) >= threshold)
+        served = int(confident.sum())
+        report["thresholds"][str(threshold)] = {
+            "served_fraction": round(served / len(texts), 4),
+            "label_agreement": round(float(((student[confident] > 0.5) == (probs[confident] > 0.5)).mean()), 4) if served else None,
+            "mean_score_diff": round(float(np.abs(4 * (student[confident] - probs[confident])).mean()), 4) if served else None,
+        }
+    return report
+
+def train(texts, scores, holdout=0.1, seed=42):
+    from suggestion.fast_path import FastScorer
+
+    probs = (np.asarray(scores, dtype=float) - 1) / 4 # BERT's 1-5 score is 1 + 4 * P(positive)
+    order = np.random.default_rng(seed).permutation(len(texts))
+    cut = int(len(texts) * (1 - holdout))
+    train_idx, test_idx = order[:cut], order[cut:]
+    vectorizer, classifier = fit([texts[i] for i in train_idx], probs[train_idx])
+    scorer = FastScorer(vectorizer, classifier, None, None, None)
+    report = evaluate(scorer, [texts[i] for i in test_idx], probs[test_idx]) if len(test_idx) else {}
+    return vectorizer, classifier, report
+
+def save(path, vectorizer, classifier, teacher_version, report):
+    import joblib
+    tmp_path = f"{path}.tmp"
+    joblib.dump({"vectorizer": vectorizer, "classifier": classifier, "teacher_version": teacher_version, "report": report}, tmp_path)
+    os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the fast-path sentiment scorer on the BERT model's scores")
+    parser.add_argument("--csv", default=REVIEWS_CSV)
+    parser.add_argument("--limit", type=int, default=None, help="distinct reviews to use (default: all)")
+    parser.add_argument("--holdout", type=float, default=0.1, help="fraction kept out of training for the report")
+    parser.add_argument("--batch-size", type=int, default=config.SENTIMENT_BATCH_SIZE)
+    parser.add_argument("--output", default=config.SENTIMENT_FAST_PATH_MODEL_PATH)
+    args = parser.parse_args()
+
+    config.SENTIMENT_FAST_PATH = False # the teacher must be BERT alone
+    texts = load_texts(args.csv, args.limit)
+    try:
+        scores = teacher_scores(texts, args.batch_size, log)
+    finally:
+        sentiment.cache.save()
+    started = time.perf_counter()
+    vectorizer, classifier, report = train(texts, scores, args.holdout)
+    report.update(train_seconds=round(time.perf_counter() - started, 2), teacher_version=sentiment.get_bert_version())
+    save(args.output, vectorizer, classifier, sentiment.get_bert_version(), report)
+    log(f"saved {args.output}")
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
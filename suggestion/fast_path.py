@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import threading
+from services import metrics
+
+# Distilled fast-path scorer: TF-IDF + logistic regression trained on the BERT model's own scores
+# (python -m suggestion.distill). It answers the texts it is confident about; the rest fall back to BERT.
+
+logger = logging.getLogger(__name__)
+
+path_texts = metrics.Counter("sentiment_texts_total", "Feedback texts scored, by the path that scored them", ("path",))
+path_seconds = metrics.Counter("sentiment_path_seconds_total", "Time spent in each scoring path", ("path",))
+path_latency = metrics.Histogram("sentiment_path_duration_seconds", "Latency of one scoring call, by path", ("path",))
+
+class FastScorer:
+    def __init__(self, vectorizer, classifier, teacher_version, confidence, version):
+        self.vectorizer = vectorizer
+        self.classifier = classifier
+        self.teacher_version = teacher_version
+        self.confidence = confidence
+        self.version = version
+
+    @classmethod
+    def load(cls, path, confidence):
+        import joblib
+        with open(path, "rb") as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:8]
+        artifact = joblib.load(path)
+        return cls(artifact["vectorizer"], artifact["classifier"], artifact["teacher_version"], confidence, version)
+
+    # P(positive) per text, as BERT's softmax would give it
+    def probabilities(self, texts):
+        features = self.vectorizer.transform(texts)
+        return self.classifier.predict_proba(features)[:, 1], features.getnnz(axis=1) > 0
+
+    # 1-5 scores on BERT's scale (1 + 4 * P(positive)) and whether each is confident enough to serve. Texts with
+    # no known words are never confident: their probability is only the model's intercept.
+    def score(self, texts):
+        probs, known = self.probabilities(texts)
+        confident = known & (abs(2 * probs - 1) >= self.confidence)
+        return (1 + 4 * probs).tolist(), confident.tolist()
+
+# texts and time per path, for the status endpoint (the same numbers go to /metrics)
+class PathStats:
+    PATHS = ("fast", "bert")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = dict.fromkeys(self.PATHS, 0)
+        self._calls = dict.fromkeys(self.PATHS, 0)
+        self._seconds = dict.fromkeys(self.PATHS, 0.0)
+
+    def record(self, path, texts, seconds):
+        path_texts.inc(texts, path=path)
+        path_seconds.inc(seconds, path=path)
+        path_latency.observe(seconds, path=path)
+        with self._lock:
+            self._texts[path] += texts
+            self._calls[path] += 1
+            self._seconds[path] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(self._texts.values())
+            return {
+                path: {
+                    "texts": self._texts[path],
+                    "fraction": round(self._texts[path] / total, 4) if total else None,
+                    "calls": self._calls[path],
+                    "ms_per_call": round(self._seconds[path] * 1000 / self._calls[path], 3) if self._calls[path] else None,
+                    "ms_per_text": round(self._seconds[path] * 1000 / self._texts[path], 3) if self._texts[path] else None,
+                }
+                for path in self.PATHS
+            }
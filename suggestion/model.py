@@ -0,0 +1,37 @@
+import torch
+import torch.nn as nn
+from transformers import BertModel
+
+BERT_MODEL_NAME = 'bert-base-uncased'
+
+# Sentiment Analysis Model
+class Sentiment(nn.Module):
+    def __init__(self):
+        super(Sentiment, self).__init__()
+        self.bert = BertModel.from_pretrained(BERT_MODEL_NAME) # extract word embeddings
+        self.lstm = nn.LSTM(768, 128, batch_first=True, bidirectional=True) # 125 hidden units - captures sequential dependencies
+        self.dropout = nn.Dropout(0.3) # training only, no weights - model.eval() turns it off
+        self.fc = nn.Linear(256, 2) # fully connected layers - 2 classes positive/negative
+
+    # BERT is frozen: its token embeddings for a text never change, so training can compute them once (suggestion/train.py)
+    def embed(self, input_ids, attention_mask):
+        with torch.no_grad():
+            return self.bert(input_ids, attention_mask)[0]
+
+    # the trained part - LSTM + fc over token embeddings
+    # lengths (real token count per row) is given for padded batches so pad tokens never reach the LSTM
+    def head(self, embeddings, lengths=None):
+        if lengths is None:
+            lstm_out, _ = self.lstm(embeddings) # passes embeddings through LSTM
+            out = torch.cat((lstm_out[:, -1, :128], lstm_out[:, 0, 128:]), dim=1) #Concatenates first and last LSTM hidden states
+        else:
+            packed = nn.utils.rnn.pack_padded_sequence(embeddings, lengths.cpu(), batch_first=True, enforce_sorted=False)
+            lstm_out, _ = self.lstm(packed)
+            lstm_out, _ = nn.utils.rnn.pad_packed_sequence(lstm_out, batch_first=True)
+            rows = torch.arange(lstm_out.size(0), device=lstm_out.device)
+            last = lstm_out[rows, lengths.to(lstm_out.device) - 1, :128] # forward state at each row's last real token
+            out = torch.cat((last, lstm_out[:, 0, 128:]), dim=1)
+        return self.fc(self.dropout(out)) # output logits
+
+    def forward(self, input_ids, attention_mask, lengths=None):
+        return self.head(self.embed(input_ids, attention_mask), lengths)
@@ -0,0 +1,45 @@
+import logging
+import os
+import torch
+import torch.nn as nn
+
+# Dynamic int8 quantization of the Sentiment model for CPU inference: the weights of every Linear layer (BERT's
+# attention and feed-forward projections, the fc head) and of the LSTM are stored as int8, activations are quantized
+# on the fly per batch. The result is saved as a whole module so workers load it instead of quantizing at boot.
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_LAYERS = {nn.Linear, nn.LSTM}
+# bumped when the Sentiment module's attributes change, since the artifact pickles the module itself
+ARTIFACT_FORMAT = 2
+
+def quantize(model):
+    return torch.ao.quantization.quantize_dynamic(model.cpu().eval(), QUANTIZED_LAYERS, dtype=torch.qint8)
+
+# the fp32 model file's version is stored with the artifact, so a retrained model is never served from a stale one
+def save(model, path, source_version):
+    tmp_path = f"{path}.tmp"
+    torch.save({"format": ARTIFACT_FORMAT, "source_version": source_version, "model": model}, tmp_path)
+    os.replace(tmp_path, path)
+
+# the saved quantized model, or None when there is none for this fp32 version
+def load(path, source_version):
+    if not os.path.exists(path):
+        return None
+    artifact = torch.load(path, map_location="cpu", weights_only=False) # a pickled module we wrote ourselves
+    if artifact.get("format") != ARTIFACT_FORMAT or artifact.get("source_version") != source_version:
+        logger.info("quantized model %s was built from another model file or code version, rebuilding", path)
+        return None
+    return artifact["model"]
+
+# load the int8 model for this fp32 file, quantizing and saving it on first use
+def load_or_build(path, source_version, build_fp32):
+    model = load(path, source_version)
+    if model is not None:
+        return model
+    model = quantize(build_fp32())
+    try:
+        save(model, path, source_version)
+    except OSError as exc: # e.g. a read-only model directory - serve it anyway, quantize again next boot
+        logger.warning("could not save quantized model to %s: %s", path, exc)
+    return model
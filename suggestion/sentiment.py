@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import config
+from services import metrics
+from services.runtime import rss_mb
+from suggestion.cache import SentimentCache
+from suggestion.fast_path import FastScorer, PathStats
+
+# torch, transformers and the model are only imported/loaded on first use (or warmup),
+# so workers that never score feedback boot without them. With SENTIMENT_SERVER_SOCKET set they are never loaded here:
+# inference goes to the shared model server (suggestion/server.py) and only the score cache stays in the worker.
+# A distilled fast-path scorer (suggestion/fast_path.py), when trained, answers confident texts before BERT is asked.
+
+logger = logging.getLogger(__name__)
+
+class SentimentDisabled(RuntimeError):
+    pass
+
+PRECISIONS = ("fp32", "int8")
+
+_lock = threading.Lock()
+_tokenizer = None
+_model = None
+_device = None
+_bert_version = None
+_model_version = None
+_client = None
+_fast = None  # FastScorer, False when there is none to use
+path_stats = PathStats()
+cache = SentimentCache(config.SENTIMENT_CACHE_SIZE, config.SENTIMENT_CACHE_PATH)
+_status = {
+    "enabled": config.SENTIMENT_ENABLED,
+    "precision": config.SENTIMENT_PRECISION,
+    "loaded": False,
+    "load_seconds": None,
+    "rss_mb_before_load": None,
+    "rss_mb_after_load": None,
+}
+
+# version of the model file, stored next to every score so rows scored by an older model can be rescored
+def _model_file_version(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def is_enabled():
+    return config.SENTIMENT_ENABLED
+
+# client of the shared model server, None when this process runs the model itself
+def _server():
+    global _client
+    if not config.SENTIMENT_SERVER_SOCKET:
+        return None
+    if _client is None or _client.socket_path != config.SENTIMENT_SERVER_SOCKET:
+        from suggestion.client import SentimentClient
+        _client = SentimentClient(config.SENTIMENT_SERVER_SOCKET, config.SENTIMENT_SERVER_TIMEOUT)
+    return _client
+
+def is_loaded():
+    if _server() is not None:
+        return get_status()["loaded"]
+    return _model is not None
+
+# the server's version when scoring remotely, so cached and stored scores name the model that produced them;
+# int8 scores differ a little from fp32 ones, so they carry their own version
+def get_bert_version():
+    global _bert_version
+    if _bert_version is None:
+        server = _server()
+        if server is not None:
+            _bert_version = server.status()["model_version"]
+        else:
+            version = _model_file_version(config.SENTIMENT_MODEL_PATH)
+            _bert_version = version if config.SENTIMENT_PRECISION == "fp32" else f"{version}-{config.SENTIMENT_PRECISION}"
+    return _bert_version
+
+# the server answers with its model version; after a restart with another model file, scores from now on carry the
+# new one and the fast-path scorer is checked against it again
+def _follow_server_version(version):
+    global _bert_version, _model_version, _fast
+    if version is not None and _bert_version is not None and version != _bert_version:
+        logger.info("sentiment server now runs model %s (was %s)", version, _bert_version)
+        with _lock:
+            _bert_version, _model_version, _fast = version, None, None
+
+# the distilled scorer, if enabled and trained against this BERT model file; loaded once
+def _fast_scorer():
+    global _fast
+    if _fast is None:
+        _fast = False
+        if config.SENTIMENT_FAST_PATH and os.path.exists(config.SENTIMENT_FAST_PATH_MODEL_PATH):
+            scorer = FastScorer.load(config.SENTIMENT_FAST_PATH_MODEL_PATH, config.SENTIMENT_FAST_PATH_CONFIDENCE)
+            # compared by model file, whatever precision the teacher ran at
+            if scorer.teacher_version.split("-")[0] == get_bert_version().split("-")[0]:
+                _fast = scorer
+            else:
+                logger.warning("fast-path scorer %s was distilled from model %s, not %s - BERT scores everything",
+                               config.SENTIMENT_FAST_PATH_MODEL_PATH, scorer.teacher_version, get_bert_version())
+    return _fast or None
+
+# BERT's version, plus the fast-path scorer's when it answers some of the texts
+def get_model_version():
+    global _model_version
+    if _model_version is None:
+        fast = _fast_scorer()
+        _model_version = f"{get_bert_version()}+fast-{fast.version}" if fast else get_bert_version()
+    return _model_version
+
+# Load tokenizer and trained model once per process
+def load():
+    global _tokenizer, _model, _device
+    if not config.SENTIMENT_ENABLED:
+        raise SentimentDisabled("sentiment model is disabled (SENTIMENT_ENABLED=false)")
+    server = _server()
+    if server is not None:
+        server.status() # reachable, model loaded there
+        return
+    if _model is not None:
+        return
+    with _lock:
+        if _model is not None:
+            return
+        if config.SENTIMENT_PRECISION not in PRECISIONS:
+            raise ValueError(f"SENTIMENT_PRECISION must be one of {', '.join(PRECISIONS)}, not {config.SENTIMENT_PRECISION!r}")
+        started, rss_before = time.perf_counter(), rss_mb()
+
+        import torch
+        from transformers import BertTokenizer
+        from suggestion.model import Sentiment, BERT_MODEL_NAME
+
+        if config.SENTIMENT_TORCH_THREADS:
+            torch.set_num_threads(config.SENTIMENT_TORCH_THREADS) # several workers each using every core oversubscribe the CPU
+        tokenizer = BertTokenizer.from_pretrained(BERT_MODEL_NAME) # for tokenizer
+
+        def fp32_model(device):
+            model = Sentiment()
+            model.load_state_dict(torch.load(config.SENTIMENT_MODEL_PATH, map_location=device))
+            return model.to(device).eval()
+
+        if config.SENTIMENT_PRECISION == "int8":
+            from suggestion import quantization
+            device = torch.device('cpu') # quantized kernels run on CPU only
+            model = quantization.load_or_build(
+                config.SENTIMENT_QUANTIZED_MODEL_PATH, _model_file_version(config.SENTIMENT_MODEL_PATH), lambda: fp32_model(device)
+            )
+            model.eval()
+        else:
+            device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            model = fp32_model(device)
+        get_model_version()
+
+        _tokenizer, _device = tokenizer, device
+        _model = model
+        _status.update(
+            precision=config.SENTIMENT_PRECISION,
+            loaded=True,
+            load_seconds=round(time.perf_counter() - started, 3),
+            rss_mb_before_load=round(rss_before, 1),
+            rss_mb_after_load=round(rss_mb(), 1),
+        )
+        logger.info("sentiment model loaded in %.2fs, rss %.0f MB -> %.0f MB",
+                    _status["load_seconds"], rss_before, _status["rss_mb_after_load"])
+
+# drop the loaded model, e.g. to load it again with another SENTIMENT_PRECISION
+def unload():
+    global _tokenizer, _model, _device, _bert_version, _model_version, _fast
+    with _lock:
+        _tokenizer = _model = _device = _bert_version = _model_version = _fast = None
+        _status.update(loaded=False, load_seconds=None, rss_mb_before_load=None, rss_mb_after_load=None)
+
+# load the model and run one inference so the first real request doesn't pay for it
+def warmup():
+    load()
+    get_sentiment_scores(["warmup"])
+    return get_status()
+
+def get_status():
+    fast = _fast or None # as loaded so far; status doesn't load it
+    status = dict(
+        _status, rss_mb=round(rss_mb(), 1), cache=cache.stats(),
+        fast_path=dict(enabled=bool(fast), confidence=fast.confidence if fast else None, paths=path_stats.snapshot()),
+    )
+    server = _server()
+    if server is not None:
+        from suggestion.client import SentimentServerUnavailable
+        try:
+            remote = server.status()
+        except SentimentServerUnavailable as exc:
+            remote = {"loaded": False, "error": str(exc)}
+        status.update(loaded=remote.get("loaded", False), server=dict(remote, socket=server.socket_path))
+    return status
+
+# map softmax probabilities to the 1-5 rating scale
+def _scale(probs):
+    sentiment_score = probs[:, 1] - probs[:, 0] # difference between prob to get sentiment score
+    return (1 + 4 * ((sentiment_score + 1) / 2)).clamp(1.0, 5.0).tolist() # scale 1-5
+
+# Batched sentiment scoring - returns one 1-5 score per text, in the order given
+# cached texts are answered from the cache; only distinct uncached texts reach the model
+def get_sentiment_scores(texts, batch_size=None):
+    texts = list(texts)
+    model_version = get_model_version()
+    keys = [cache.key(text, model_version) for text in texts]
+    scores = [cache.get(key) for key in keys]
+
+    missing = {}
+    for text, key, score in zip(texts, keys, scores):
+        if score is None and key not in missing:
+            missing[key] = text
+    if missing:
+        with metrics.phase("inference"):
+            inferred = dict(zip(missing, _score(list(missing.values()), batch_size)))
+        if get_model_version() != model_version:
+            # the model server came back with another model: cache hits and keys above belong to the old one
+            return get_sentiment_scores(texts, batch_size)
+        for key, score in inferred.items():
+            cache.set(key, score)
+        scores = [inferred[key] if score is None else score for key, score in zip(keys, scores)]
+    return scores
+
+# the fast-path scorer's score for texts it is confident about, BERT's for the rest
+def _score(texts, batch_size=None):
+    fast = _fast_scorer()
+    scores, confident = None, [False] * len(texts)
+    if fast:
+        started = time.perf_counter()
+        scores, confident = fast.score(texts)
+        path_stats.record("fast", sum(confident), time.perf_counter() - started)
+    uncertain = [i for i, ok in enumerate(confident) if not ok]
+    if not uncertain:
+        return scores
+    started = time.perf_counter()
+    bert_scores = _infer([texts[i] for i in uncertain], batch_size)
+    path_stats.record("bert", len(uncertain), time.perf_counter() - started)
+    if scores is None:
+        return bert_scores
+    for i, score in zip(uncertain, bert_scores):
+        scores[i] = score
+    return scores
+
+# run the model over texts in length buckets
+def _infer(texts, batch_size=None):
+    server = _server()
+    if server is not None:
+        scores = server.infer(texts) # batched on the server, together with the other workers' requests
+        _follow_server_version(server.model_version)
+        return scores
+    load()
+    import torch
+    import torch.nn.functional as F
+
+    batch_size = batch_size or config.SENTIMENT_BATCH_SIZE
+    encoded = _tokenizer(texts, truncation=True, max_length=256) # tokenize without padding
+    lengths = [len(ids) for ids in encoded['input_ids']]
+    # sort by length so each batch is a bucket of similar lengths, padded only to its own longest sequence
+    order = sorted(range(len(texts)), key=lengths.__getitem__)
+    scores = [None] * len(texts)
+
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        padded = _tokenizer.pad(
+            {'input_ids': [encoded['input_ids'][i] for i in bucket], 'attention_mask': [encoded['attention_mask'][i] for i in bucket]},
+            return_tensors='pt',
+        )
+        input_ids, attention_mask = padded['input_ids'].to(_device), padded['attention_mask'].to(_device)
+        bucket_lengths = torch.tensor([lengths[i] for i in bucket])
+
+        with torch.no_grad():
+            probs = F.softmax(_model(input_ids, attention_mask, bucket_lengths), dim=1) # applies softmax to logits to get probabilities
+        for i, score in zip(bucket, _scale(probs)):
+            scores[i] = score
+    return scores
+
+# Sentiment scoring function for a single text
+def get_sentiment_score(text):
+    return get_sentiment_scores([text])[0]
@@ -0,0 +1,199 @@
+"""Sentiment model server shared by every API worker on the host.
+
+    python -m suggestion.server --socket /run/carpooling/sentiment.sock --threads 4
+
+Loads bert-base-uncased + the LSTM head once, with torch pinned to --threads intra-op threads, and answers scoring
+requests over a Unix socket. Requests arriving from all workers within SENTIMENT_SERVER_MAX_WAIT_MS are coalesced into
+one batch (up to SENTIMENT_BATCH_SIZE texts, duplicates scored once). API workers started with SENTIMENT_SERVER_SOCKET
+set to the same path send their inference here and never import torch, so their memory no longer includes the model.
+"""
+import argparse
+import logging
+import os
+import queue
+import socketserver
+import threading
+import time
+import config
+from suggestion.client import recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+class _Pending:
+    __slots__ = ("texts", "scores", "error", "done")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.scores = None
+        self.error = None
+        self.done = threading.Event()
+
+# Collects requests from every connection and runs them through infer together: the first request opens a batch,
+# which closes after max_wait_seconds or once it holds max_batch texts
+class Batcher:
+    def __init__(self, infer, max_batch, max_wait_seconds):
+        self.infer = infer
+        self.max_batch = max_batch
+        self.max_wait_seconds = max_wait_seconds
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.batch_texts = 0  # distinct texts sent to the model
+        self.infer_seconds = 0.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts):
+        pending = _Pending(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.scores
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, count = [first], len(first.texts)
+            deadline = time.monotonic() + self.max_wait_seconds
+            closing = False
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    closing = True
+                    break
+                batch.append(pending)
+                count += len(pending.texts)
+            self._score(batch)
+            if closing:
+                return
+
+    def _score(self, batch):
+        distinct = list(dict.fromkeys(text for pending in batch for text in pending.texts))
+        started = time.perf_counter()
+        try:
+            scores = dict(zip(distinct, self.infer(distinct))) if distinct else {}
+            for pending in batch:
+                pending.scores = [scores[text] for text in pending.texts]
+        except Exception as exc:
+            logger.exception("sentiment batch of %d texts failed", len(distinct))
+            for pending in batch:
+                pending.error = exc
+        finally:
+            with self._stats_lock:
+                self.requests += len(batch)
+                self.texts += sum(len(pending.texts) for pending in batch)
+                self.batches += 1
+                self.batch_texts += len(distinct)
+                self.infer_seconds += time.perf_counter() - started
+            for pending in batch:
+                pending.done.set()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "mean_batch_texts": round(self.batch_texts / self.batches, 2) if self.batches else None,
+                "infer_seconds_total": round(self.infer_seconds, 3),
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+            }
+
+class _Handler(socketserver.BaseRequestHandler):
+    # one connection per API worker thread, kept open for many requests
+    def handle(self):
+        server = self.server
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (OSError, ValueError):
+                return
+            if message is None:
+                return
+            try:
+                if message.get("op") == "infer":
+                    # the version with every answer, so workers notice a restart with another model file
+                    response = {"scores": server.batcher.submit(list(message["texts"])), "model_version": server.model_version()}
+                elif message.get("op") == "status":
+                    response = dict(server.status(), batching=server.batcher.stats())
+                else:
+                    response = {"error": f"unknown op {message.get('op')!r}"}
+            except Exception as exc:
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+            try:
+                send_message(self.request, response)
+            except OSError:
+                return
+
+class SentimentServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    # infer(texts) -> scores, status() -> dict and model_version() -> str; the model's by default
+    def __init__(self, socket_path, infer=None, status=None, max_batch=None, max_wait_seconds=None, model_version=None):
+        if infer is None or status is None:
+            from suggestion import sentiment
+            infer = infer or sentiment.get_sentiment_scores  # the server's cache is shared by every worker
+            status = status or (lambda: dict(sentiment.get_status(), model_version=sentiment.get_model_version()))
+            model_version = model_version or sentiment.get_model_version
+        self.status = status
+        self.model_version = model_version or (lambda: status()["model_version"])
+        self.batcher = Batcher(
+            infer,
+            max_batch or config.SENTIMENT_BATCH_SIZE,
+            config.SENTIMENT_SERVER_MAX_WAIT_MS / 1000 if max_wait_seconds is None else max_wait_seconds,
+        )
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a previous run
+        super().__init__(socket_path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the sentiment model to the API workers over a Unix socket")
+    parser.add_argument("--socket", default=config.SENTIMENT_SERVER_SOCKET, required=not config.SENTIMENT_SERVER_SOCKET,
+                        help="socket path (default: SENTIMENT_SERVER_SOCKET)")
+    parser.add_argument("--threads", type=int, default=config.SENTIMENT_TORCH_THREADS or os.cpu_count(),
+                        help="torch intra-op threads (default: SENTIMENT_TORCH_THREADS, else one per core)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    # this process runs the model itself; SENTIMENT_SERVER_SOCKET only names where to listen
+    config.SENTIMENT_SERVER_SOCKET = None
+    config.SENTIMENT_FAST_PATH = False # workers answer what the fast-path scorer can before calling the server
+    config.SENTIMENT_TORCH_THREADS = args.threads
+    from suggestion import sentiment
+    sentiment.warmup()
+
+    server = SentimentServer(args.socket)
+    os.chmod(args.socket, 0o660)
+    logger.info("sentiment server listening on %s (%d torch threads)", args.socket, args.threads)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        sentiment.cache.save()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Train the sentiment model's LSTM head on cached, frozen BERT embeddings.
+
+    python -m suggestion.train
+    python -m suggestion.train --epochs 5 --batch-size 32 --lr 1e-3 --workers 2
+
+Replaces the training loop in suggestion/lstm_model.ipynb. Labels are the same (stars >= 3 positive, 80/20 split).
+The reviews are tokenized the way suggestion.sentiment tokenizes feedback at serving time, with no stop-word removal.
+
+1. BERT is frozen (Sentiment.embed), so each review's token embeddings are computed once. They are written to a
+   memory-mapped array under --cache-dir: one row per token, reviews back to back, float16 by default. A later run
+   over the same reviews reuses the cache.
+2. The LSTM + fc head trains on batches streamed from that array by a DataLoader. Reviews of similar length share a
+   batch, so little padding is read. Only the batches in flight are held in memory.
+3. The trained model (BERT weights included, the same format as bert_lstm_sentiment_model3.pth) is written to
+   --output-dir as sentiment-<timestamp>-<sha>.pth, with a .json next to it holding the metrics and settings.
+   Point SENTIMENT_MODEL_PATH at it to serve it.
+
+Prints one JSON report: embedding time and cache size, per-epoch time / loss / validation accuracy, and peak memory.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, Dataset, Sampler
+import config
+from services.runtime import rss_mb
+from suggestion.model import BERT_MODEL_NAME, Sentiment
+
+REVIEWS_CSV = os.path.join(config.BASE_DIR, "suggestion", "uber_reviews_without_reviewid.csv")
+CACHE_DIR = os.path.join(config.BASE_DIR, "suggestion", "embedding_cache")
+OUTPUT_DIR = os.path.join(config.BASE_DIR, "suggestion", "models")
+MAX_LENGTH = 256 # tokens per review, as at serving time
+EMBEDDING_DIM = 768
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+# ru_maxrss is in KB on Linux, bytes on macOS
+def _max_rss_mb(who):
+    return resource.getrusage(who).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+# DataLoader worker processes are counted under RUSAGE_CHILDREN
+def peak_rss_mb():
+    return round(_max_rss_mb(resource.RUSAGE_SELF), 1), round(_max_rss_mb(resource.RUSAGE_CHILDREN), 1)
+
+# (text, label) pairs; the notebook's labels: 1 (positive) for 3-5 stars, 0 for 1-2
+def load_reviews(path=REVIEWS_CSV, limit=None):
+    reviews = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["content"] and row["score"]:
+                reviews.append((row["content"], 1 if int(row["score"]) >= 3 else 0))
+                if limit and len(reviews) >= limit:
+                    break
+    return reviews
+
+# Token embeddings of every review in one memory-mapped (total tokens, 768) array; review i is rows offsets[i]:offsets[i + 1]
+class EmbeddingCache:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"))
+        self._embeddings = None
+
+    # opened on first read, so each DataLoader worker maps the file itself
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = np.memmap(os.path.join(self.directory, "embeddings.bin"), dtype=self.meta["dtype"], mode="r",
+                                         shape=(self.meta["tokens"], EMBEDDING_DIM))
+        return self._embeddings
+
+    def __getstate__(self):
+        return dict(self.__dict__, _embeddings=None)
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def __getitem__(self, i):
+        return self.embeddings[self.offsets[i]:self.offsets[i + 1]]
+
+    # run BERT once over texts and write the cache; a complete cache for the same texts and settings is reused
+    @classmethod
+    def build(cls, root, texts, model, tokenizer, device, dtype="float16", batch_size=64):
+        key = hashlib.sha256("\0".join([BERT_MODEL_NAME, str(MAX_LENGTH), dtype, *texts]).encode("utf-8")).hexdigest()[:16]
+        directory = os.path.join(root, key)
+        if os.path.exists(os.path.join(directory, "meta.json")):
+            log(f"using cached embeddings in {directory}")
+            return cls(directory), 0.0
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+
+        encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        lengths = np.array([len(ids) for ids in encoded], dtype=np.int64)
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        embeddings = np.memmap(os.path.join(directory, "embeddings.bin"), dtype=dtype, mode="w+", shape=(int(offsets[-1]), EMBEDDING_DIM))
+
+        # length buckets, as in sentiment._infer: each batch padded only to its own longest review
+        order = np.argsort(lengths, kind="stable")
+        for done, start in enumerate(range(0, len(order), batch_size), start=1):
+            bucket = order[start:start + batch_size]
+            padded = tokenizer.pad({"input_ids": [encoded[i] for i in bucket]}, return_tensors="pt")
+            output = model.embed(padded["input_ids"].to(device), padded["attention_mask"].to(device)).cpu().numpy()
+            for row, i in enumerate(bucket):
+                embeddings[offsets[i]:offsets[i + 1]] = output[row, :lengths[i]]
+            if done % 50 == 0:
+                log(f"embedded {min(start + batch_size, len(order))}/{len(order)} reviews ({time.perf_counter() - started:.0f}s)")
+        embeddings.flush()
+        del embeddings
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        meta = {"reviews": len(texts), "tokens": int(offsets[-1]), "dtype": dtype, "bert": BERT_MODEL_NAME, "max_length": MAX_LENGTH}
+        with open(os.path.join(directory, "meta.json"), "w") as f: # written last: marks the cache complete
+            json.dump(meta, f)
+        return cls(directory), time.perf_counter() - started
+
+class ReviewEmbeddings(Dataset):
+    def __init__(self, cache, indices, labels):
+        self.cache = cache
+        self.indices = indices
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        i = self.indices[item]
+        return torch.from_numpy(np.asarray(self.cache[i], dtype=np.float32)), self.labels[i]
+
+# batches of reviews with similar token counts, in random order each epoch
+class LengthBucketSampler(Sampler):
+    def __init__(self, lengths, batch_size, shuffle, seed=42):
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = random.Random(seed)
+
+    def __iter__(self):
+        order = list(range(len(self.lengths)))
+        if self.shuffle:
+            self.rng.shuffle(order) # ties in length land in different batches each epoch
+        order.sort(key=self.lengths.__getitem__)
+        batches = [order[start:start + self.batch_size] for start in range(0, len(order), self.batch_size)]
+        if self.shuffle:
+            self.rng.shuffle(batches)
+        return iter(batches)
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+def collate(items):
+    embeddings, labels = zip(*items)
+    lengths = torch.tensor([len(e) for e in embeddings])
+    return nn.utils.rnn.pad_sequence(embeddings, batch_first=True), lengths, torch.tensor(labels)
+
+def loader(cache, indices, labels, batch_size, shuffle, workers):
+    lengths = cache.lengths()[indices].tolist()
+    return DataLoader(
+        ReviewEmbeddings(cache, indices, labels), batch_sampler=LengthBucketSampler(lengths, batch_size, shuffle),
+        collate_fn=collate, num_workers=workers, persistent_workers=workers > 0,
+    )
+
+def evaluate(model, batches, device):
+    model.eval()
+    tp = fp = fn = tn = 0
+    with torch.no_grad():
+        for embeddings, lengths, labels in batches:
+            predictions = model.head(embeddings.to(device), lengths).argmax(dim=1).cpu()
+            tp += int(((predictions == 1) & (labels == 1)).sum())
+            fp += int(((predictions == 1) & (labels == 0)).sum())
+            fn += int(((predictions == 0) & (labels == 1)).sum())
+            tn += int(((predictions == 0) & (labels == 0)).sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        "accuracy": round((tp + tn) / max(tp + fp + fn + tn, 1), 4),
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "confusion_matrix": [[tn, fp], [fn, tp]],
+    }
+
+# state dict written to a temp file first; the file name carries the time and its content hash
+def save_model(model, output_dir, report):
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    tmp_path = os.path.join(output_dir, f".sentiment-{stamp}.pth.tmp")
+    torch.save(model.state_dict(), tmp_path)
+    digest = hashlib.sha256()
+    with open(tmp_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    path = os.path.join(output_dir, f"sentiment-{stamp}-{digest.hexdigest()[:8]}.pth")
+    os.replace(tmp_path, path)
+    with open(os.path.splitext(path)[0] + ".json", "w") as f:
+        json.dump(dict(report, model_file=os.path.basename(path), model_version=digest.hexdigest()[:16]), f, indent=2)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the sentiment LSTM head on cached frozen-BERT embeddings")
+    parser.add_argument("--csv", default=REVIEWS_CSV)
+    parser.add_argument("--limit", type=int, default=None, help="use only the first N reviews")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--lr", type=float, default=2e-5)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--cache-dtype", choices=("float16", "float32"), default="float16")
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--threads", type=int, default=config.SENTIMENT_TORCH_THREADS, help="torch intra-op threads (0 = torch default)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    torch.manual_seed(args.seed)
+    from transformers import BertTokenizer
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    reviews = load_reviews(args.csv, args.limit)
+    texts, labels = [text for text, _ in reviews], [label for _, label in reviews]
+    tokenizer = BertTokenizer.from_pretrained(BERT_MODEL_NAME)
+    model = Sentiment().to(device)
+    model.bert.eval()
+    cache, embed_seconds = EmbeddingCache.build(args.cache_dir, texts, model, tokenizer, device, args.cache_dtype, args.embed_batch_size)
+
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    cut = int(len(texts) * (1 - args.val_fraction))
+    train_batches = loader(cache, order[:cut], labels, args.batch_size, True, args.workers)
+    val_batches = loader(cache, order[cut:], labels, args.batch_size, False, args.workers)
+
+    trainable = list(model.lstm.parameters()) + list(model.fc.parameters())
+    optimizer = torch.optim.AdamW(trainable, lr=args.lr)
+    criterion = nn.CrossEntropyLoss()
+    if device.type == "cuda":
+        torch.cuda.reset_peak_memory_stats()
+    epochs = []
+    for epoch in range(1, args.epochs + 1):
+        model.train()
+        model.bert.eval()
+        started, total_loss = time.perf_counter(), 0.0
+        for embeddings, lengths, batch_labels in train_batches:
+            optimizer.zero_grad()
+            loss = criterion(model.head(embeddings.to(device), lengths), batch_labels.to(device))
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item()
+        train_seconds = time.perf_counter() - started
+        metrics = evaluate(model, val_batches, device)
+        epochs.append({
+            "epoch": epoch, "seconds": round(train_seconds, 2), "loss": round(total_loss / len(train_batches), 4),
+            "val_accuracy": metrics["accuracy"], "rss_mb": round(rss_mb(), 1),
+        })
+        log(f"epoch {epoch}/{args.epochs}: loss {epochs[-1]['loss']:.4f}, val accuracy {metrics['accuracy']:.2%}, {train_seconds:.1f}s")
+
+    model.eval()
+    peak_self, peak_workers = peak_rss_mb()
+    report = {
+        "reviews": len(texts),
+        "train_reviews": cut,
+        "val_reviews": len(texts) - cut,
+        "embedding_cache": {
+            "directory": cache.directory, "tokens": cache.meta["tokens"], "dtype": cache.meta["dtype"],
+            "size_mb": round(os.path.getsize(os.path.join(cache.directory, "embeddings.bin")) / 2**20, 1),
+            "build_seconds": round(embed_seconds, 2), # 0 when reused
+        },
+        "epochs": epochs,
+        "mean_epoch_seconds": round(sum(e["seconds"] for e in epochs) / len(epochs), 2) if epochs else None,
+        "validation": evaluate(model, val_batches, device) if epochs else None,
+        "peak_rss_mb": peak_self,
+        "peak_rss_mb_dataloader_workers": peak_workers if args.workers else None,
+        "peak_cuda_mb": round(torch.cuda.max_memory_allocated() / 2**20, 1) if device.type == "cuda" else None,
+        "settings": {key: value for key, value in vars(args).items() if key not in ("csv", "output_dir", "cache_dir")},
+    }
+    path = save_model(model, args.output_dir, report)
+    log(f"saved {path} - serve it with SENTIMENT_MODEL_PATH={path}")
+    print(json.dumps(dict(report, model_file=path), indent=2))
+
+if __name__ == "__main__":
+    main()
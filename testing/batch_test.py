@@ -0,0 +1,28 @@
+import asyncio
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app_models.vehicle_pricing import VehiclePricing
+from crud_async.batch import create_many
+from migrations import runner
+from schemas.vehicle_pricing import VehiclePricingCreate
+
+# an item the database rejects (here a duplicate of a unique column) is reported; the others are still created
+def test_constraint_violation_only_rejects_its_item(tmp_path):
+    path = tmp_path / "batch.db"
+    runner.upgrade(create_engine(f"sqlite:///{path}"), log=lambda message: None)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    items = [{"vehicle_type": "Car", "rate_per_km": 1.0}, {"vehicle_type": "Car", "rate_per_km": 2.0}, {"vehicle_type": "Van", "rate_per_km": 3.0}]
+
+    async def scenario():
+        async with Session() as db:
+            _, result = await create_many(db, VehiclePricing, VehiclePricingCreate, items)
+        async with Session() as db:
+            rows = (await db.scalars(select(VehiclePricing).order_by(VehiclePricing.id))).all()
+        await engine.dispose()
+        return result, rows
+
+    result, rows = asyncio.run(scenario())
+    assert result.created == 2 and result.ids[1] is None
+    assert [(error.index, error.errors[0]["type"]) for error in result.errors] == [(1, "integrity_error")]
+    assert [(row.id, row.vehicle_type, row.rate_per_km) for row in rows] == [(result.ids[0], "Car", 1.0), (result.ids[2], "Van", 3.0)]
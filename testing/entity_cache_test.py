@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app_models.user import User
+from services.entity_cache import EntityCache
+
+def make_session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    User.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+def test_cached_rows_never_overwrite_the_session_or_hold_passwords():
+    Session = make_session()
+    cache = EntityCache(User, exclude=("password",))
+    with Session() as db:
+        db.add(User(id=1, full_name="Ann", email="ann@example.com", password="hash"))
+        db.commit()
+        assert cache.get(db, 1).full_name == "Ann"
+    assert "password" not in cache.cache.get(1)
+
+    with Session() as db:
+        user = db.get(User, 1)
+        user.full_name = "Ann B" # pending in this unit of work
+        assert cache.get(db, 1) is user and user.full_name == "Ann B"
+
+    # from the snapshot without a row query; the excluded column loads when read
+    with Session() as db:
+        user = cache.get(db, 1)
+        assert user.full_name == "Ann" and user.password == "hash"
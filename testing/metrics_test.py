@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+from db import engine, Base
+from main import app
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.create_all(bind=engine)
+    return TestClient(app)
+
+def test_server_timing_header(client):
+    response = client.get("/trips/trips/")
+    assert response.status_code == 200
+    phases = {part.split(";")[0].strip() for part in response.headers["Server-Timing"].split(",")}
+    assert phases == {"db", "inference", "serialization", "total"}
+    assert 'desc="0 queries"' not in response.headers["Server-Timing"]
+
+def test_metrics_endpoint(client):
+    client.get("/trips/trips/")
+    client.get("/no/such/path")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    # labelled by route template (with the router prefix), unknown paths folded into one series
+    assert 'http_requests_total{method="GET",route="/trips/trips/",status="200"}' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/trips/trips/",le="+Inf"}' in text
+    assert 'http_request_db_queries_total{route="/trips/trips/"}' in text
+    assert 'db_queries_total{statement="SELECT"}' in text
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+import db
+import main  # noqa: F401 - register every model on db.Base
+from migrations import runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the migrations must produce the schema the models describe, now that nothing calls create_all at boot
+def test_migrations_match_models():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    runner.upgrade(engine, log=lambda message: None)
+    assert runner.pending(engine) == []
+
+    inspector = inspect(engine)
+    for table in db.Base.metadata.sorted_tables:
+        assert inspector.has_table(table.name), table.name
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert {c.name for c in table.columns} <= columns, table.name
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        assert {i.name for i in table.indexes} <= indexes, table.name
+
+# the baseline is frozen at the original schema, so the later migrations do the work on a fresh database
+def test_baseline_is_the_original_schema():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    runner.upgrade(engine, target="0001", log=lambda message: None)
+    inspector = inspect(engine)
+    assert "sentiment_score" not in {c["name"] for c in inspector.get_columns("ratings")}
+    assert "ix_trips_date_id" not in {i["name"] for i in inspector.get_indexes("trips")}
+    assert not inspector.has_table("driver_rating_stats")
+
+# importing the app must not open a database connection (no DDL, no reflection)
+def test_boot_does_not_touch_database():
+    script = (
+        "from sqlalchemy import event\n"
+        "import db\n"
+        "connections = []\n"
+        "event.listen(db.engine.pool, 'connect', lambda *args: connections.append(1))\n"
+        "import main\n"
+        "assert not connections, connections\n"
+    )
+    env = dict(os.environ, DATABASE_URL="sqlite:////nonexistent/dir/boot.db", SENTIMENT_ENABLED="false")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+# real connections, as runner.upgrade opens them; only the dialect name and the executed DDL are faked
+def test_online_index_ddl():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE trips (id INTEGER, date DATETIME)")
+    statements = []
+
+    def create_index(conn, dialect):
+        op = runner.Operations(conn)
+        op.dialect = dialect
+        op.execute = statements.append
+        op.create_index("ix_trips_date_id", "trips", ["date", "id"], online=True)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for dialect in ("mysql", "postgresql", "sqlite"):
+            create_index(conn, dialect)
+    assert statements == [
+        "CREATE INDEX ix_trips_date_id ON trips (date, id) ALGORITHM=INPLACE LOCK=NONE",
+        "CREATE INDEX CONCURRENTLY ix_trips_date_id ON trips (date, id)",
+        "CREATE INDEX ix_trips_date_id ON trips (date, id)",
+    ]
+
+    # CONCURRENTLY can't run in a transactional migration
+    with engine.begin() as conn:
+        with pytest.raises(RuntimeError, match="transactional = False"):
+            create_index(conn, "postgresql")
@@ -0,0 +1,26 @@
+import asyncio
+import time
+import pytest
+from services.passwords import PasswordPool, PasswordPoolBusy, PasswordPoolTimeout
+
+# time.sleep stands in for bcrypt: a job the caller gives up on keeps running in the worker process
+def test_timed_out_jobs_hold_their_slot_until_the_worker_finishes():
+    pool = PasswordPool(workers=1, max_pending=1, timeout_seconds=0.2)
+
+    async def scenario():
+        with pytest.raises(PasswordPoolTimeout):
+            await pool.run(time.sleep, 1.5)
+        with pytest.raises(PasswordPoolBusy):
+            await pool.run(time.sleep, 0)
+        for _ in range(100):
+            if pool.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert await pool.run(abs, -3) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert (stats["pending"], stats["completed"], stats["timeouts"], stats["rejected"], stats["errors"]) == (0, 1, 1, 1, 0)
@@ -0,0 +1,36 @@
+import torch
+import torch.nn as nn
+from suggestion import quantization
+
+# a small LSTM + Linear model standing in for Sentiment (whose BERT weights would need a download)
+class Head(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.lstm = nn.LSTM(16, 8, batch_first=True, bidirectional=True)
+        self.fc = nn.Linear(16, 2)
+
+    def forward(self, x):
+        out, _ = self.lstm(x)
+        return self.fc(out[:, -1])
+
+def test_quantized_model_is_saved_once_per_source_version(tmp_path):
+    torch.manual_seed(0)
+    path, builds = str(tmp_path / "head.int8.pt"), []
+
+    def build():
+        builds.append(1)
+        return Head()
+
+    x = torch.randn(4, 5, 16)
+    first = quantization.load_or_build(path, "v1", build)
+    assert isinstance(first.fc, torch.ao.nn.quantized.dynamic.Linear)
+    assert isinstance(first.lstm, torch.ao.nn.quantized.dynamic.LSTM)
+
+    # loaded from disk, not quantized again
+    again = quantization.load_or_build(path, "v1", build)
+    assert len(builds) == 1
+    assert torch.allclose(first(x), again(x))
+
+    # a new fp32 model file invalidates the artifact
+    quantization.load_or_build(path, "v2", build)
+    assert len(builds) == 2
@@ -0,0 +1,50 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Query budgets for tests: count the SQL statements issued while a block runs (engine events, so lazy loads and
+# other implicit queries are counted too) and fail when there are more than the block is allowed.
+#
+#     with query_budget(2, engine, async_engine.sync_engine):
+#         client.get("/bookings/trips/1")
+#
+# Counts are per statement sent to the driver, as SQLite sees them - BEGIN/COMMIT are not cursor executes there.
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+# statements executed on the given engines while the block runs
+class QueryCounter:
+    def __init__(self, *engines):
+        self.engines = engines
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def report(self):
+        return "\n".join(f"  {i}. {' '.join(statement.split())}" for i, statement in enumerate(self.statements, start=1))
+
+# fail with every statement listed when the block issues more than budget statements
+@contextmanager
+def query_budget(budget, *engines, label="block"):
+    with QueryCounter(*engines) as counter:
+        yield counter
+    if counter.count > budget:
+        raise QueryBudgetExceeded(f"{label} issued {counter.count} SQL statements, budget is {budget}:\n{counter.report()}")
+
+# (METHOD, path) of every route declared on a router, paths as written on the router (without the include prefix)
+def declared_routes(router):
+    return {(method, route.path) for route in router.routes for method in getattr(route, "methods", None) or ()}
@@ -0,0 +1,217 @@
+import pkgutil
+from importlib import import_module
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+import config
+import db
+import routers
+from app_models.booking import RideBooking
+from app_models.passenger import Passenger
+from app_models.trip import Trip
+from benchmarks.seed import PASSWORD, email, seed
+from crud import booking as booking_crud
+from main import app
+from services import entity_cache, geo_index
+from testing.query_budget import QueryBudgetExceeded, declared_routes, query_budget
+
+# a request body / query built from the seeded ids, see _payload()
+class seeded(str):
+    pass
+
+# SQL statement budgets per endpoint, checked against a seeded SQLite database. A list endpoint's budget must not
+# depend on how many rows it returns - the seeded trips have several bookings, drivers and vehicles each, so a lazy
+# load or per-row lookup that creeps back in pushes the count over. Every route of every module in routers/ needs one.
+#
+# router module -> (method, path as declared on the router, request path, budget, request options). Request paths are
+# formatted with the seeded ids (see ids()); options are passed to the client, plus "status" when it isn't 200.
+# Batch creates insert row by row on SQLite (no multi-row INSERT ... RETURNING), so theirs are for the two items sent,
+# plus the SAVEPOINT / RELEASE around the inserts.
+BUDGETS = {
+    "booking": [
+        ("GET", "/ride_bookings/trip/booking_id/{trip_id}/{user_id}", "/ride_bookings/trip/booking_id/{trip}/{rider}", 1, {}),
+        ("GET", "/trips/{trip_id}", "/trips/{trip}", 1, {}),
+        ("POST", "/ride_bookings/", "/ride_bookings/", 1, {"json": seeded("booking")}),
+        ("POST", "/ride_bookings/batch", "/ride_bookings/batch", 8, {"json": {"items": [seeded("booking"), seeded("booking")]}}),
+        ("PUT", "/ride_bookings/{booking_id}", "/ride_bookings/{booking}", 2, {"json": {"confirmed": False}}),
+    ],
+    "destination": [
+        ("POST", "/destinations/", "/destinations/", 1, {"json": seeded("location")}),
+        ("POST", "/destinations/batch", "/destinations/batch", 4, {"json": {"items": [seeded("location"), seeded("location")]}}),
+        ("GET", "/destinations/near", "/destinations/near", 2, {"params": seeded("near")}),
+    ],
+    "passenger": [
+        ("POST", "/passengers/", "/passengers/", 1, {"json": seeded("passenger")}),
+        ("POST", "/passengers/batch", "/passengers/batch", 6, {"json": {"items": [seeded("passenger"), seeded("passenger")]}}),
+        ("GET", "/passengers/{passenger_id}", "/passengers/{passenger}", 1, {}),
+    ],
+    "rating": [
+        ("POST", "/ratings/", "/ratings/", 2, {"json": seeded("rating")}),
+    ],
+    "start": [
+        ("POST", "/starts/", "/starts/", 1, {"json": seeded("location")}),
+        ("POST", "/starts/batch", "/starts/batch", 4, {"json": {"items": [seeded("location"), seeded("location")]}}),
+        ("GET", "/starts/near", "/starts/near", 2, {"params": seeded("near")}),
+    ],
+    "system": [
+        ("GET", "/db/pool", "/db/pool", 0, {}),
+        ("GET", "/password-pool", "/password-pool", 0, {}),
+    ],
+    "trip": [
+        ("GET", "/suggestion/ready", "/suggestion/ready", 0, {"status": 503}),
+        ("POST", "/suggestion/warmup", "/suggestion/warmup", 0, {"status": 503}),
+        ("GET", "/suggestion/", "/suggestion/", 1, {}),
+        ("GET", "/trips/near", "/trips/near", 3, {"params": seeded("near")}),
+        ("GET", "/trips/rider/{user_id}", "/trips/rider/{rider}", 2, {}),
+        ("POST", "/trips/", "/trips/", 1, {"json": seeded("trip")}),
+        ("POST", "/trips/batch", "/trips/batch", 6, {"json": {"items": [seeded("trip"), seeded("trip")]}}),
+        ("GET", "/trips/{trip_id}", "/trips/{trip}", 1, {}),
+        ("GET", "/trips/driver/{user_id}", "/trips/driver/{driver}", 1, {}),
+        ("GET", "/trips/", "/trips/", 3, {}),
+        ("POST", "/trips/{trip_id}/reserve", "/trips/{trip}/reserve", 1, {"json": {"seats": 1}}),
+        ("POST", "/trips/{trip_id}/release", "/trips/{trip}/release", 1, {"json": {"seats": 1}}),
+        ("PUT", "/trips/{trip_id}", "/trips/{trip}", 1, {"json": {"status": "Scheduled"}}),
+    ],
+    "user": [
+        ("POST", "/login/", "/login/", 1, {"data": seeded("login")}),
+        ("POST", "/users/", "/users/", 2, {"json": seeded("user"), "status": 201}),
+        ("GET", "/users/{user_id}", "/users/{rider}", 1, {}),
+    ],
+    "vehicle": [
+        ("POST", "/vehicles/", "/vehicles/", 1, {"json": seeded("vehicle")}),
+        ("GET", "/vehicles/{vehicle_id}", "/vehicles/{vehicle}", 1, {}),
+        ("GET", "/vehicles/user/{user_id}", "/vehicles/user/{driver}", 1, {}),
+    ],
+    "vehicle_pricing": [
+        ("POST", "/vehicle_pricing/", "/vehicle_pricing/", 3, {"json": {"vehicle_type": "Car", "rate_per_km": 80.0}}),
+        ("GET", "/vehicle_pricings/", "/vehicle_pricings/", 1, {}),
+        ("POST", "/fare_quotes/", "/fare_quotes/", 1, {"json": seeded("fare_quotes")}),
+    ],
+}
+# prefixes the routers are included under in main.py
+PREFIXES = {
+    "booking": "/bookings", "destination": "/destinations", "passenger": "/passengers", "rating": "/ratings", "start": "/starts",
+    "system": "/system", "trip": "/trips", "user": "/users", "vehicle": "/vehicles", "vehicle_pricing": "/pricing",
+}
+
+CASES = [(module, *case) for module, cases in BUDGETS.items() for case in cases]
+
+@pytest.fixture(scope="module")
+def budget_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("query_budget") / "budget.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    seed(engine, users=24, drivers=4, trips=40, bookings=80, ratings=60, locations=30, log=lambda message: None)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield engine, async_engine
+    engine.dispose()
+    async_engine.sync_engine.dispose()
+
+# the seeded rows the requests point at: the trip with the most bookings, one of its riders, its driver
+@pytest.fixture(scope="module")
+def ids(budget_db):
+    engine, _ = budget_db
+    with sessionmaker(bind=engine)() as session:
+        trip_id = session.scalar(
+            select(RideBooking.trip_id).group_by(RideBooking.trip_id).order_by(func.count().desc(), RideBooking.trip_id).limit(1)
+        )
+        passenger = session.scalars(select(Passenger).where(Passenger.trip_id == trip_id).order_by(Passenger.id)).first()
+        driver = session.get(Trip, trip_id).user_id
+        booking_id = session.scalar(select(RideBooking.id).where(RideBooking.passenger_id == passenger.id))
+        return {
+            "trip": trip_id, "rider": passenger.user_id, "passenger": passenger.id, "booking": booking_id,
+            "driver": driver, "vehicle": driver,  # the seed gives driver n vehicle n
+        }
+
+@pytest.fixture(scope="module")
+def client(budget_db):
+    engine, async_engine = budget_db
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        with Session() as session:
+            yield session
+
+    async def get_async_db():
+        async with AsyncSession() as session:
+            yield session
+
+    app.dependency_overrides[db.get_db] = get_db
+    app.dependency_overrides[db.get_async_db] = get_async_db
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(config, "SENTIMENT_ENABLED", False)  # no model load inside a budget
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+    _reset_process_caches()
+
+# the entity caches and location indexes outlive a request; start every measurement cold so budgets are worst case
+def _reset_process_caches():
+    for cache in (entity_cache.user_cache, entity_cache.vehicle_cache, entity_cache.vehicle_pricing_cache):
+        cache.cache.clear()
+    geo_index.start_index.reset()
+    geo_index.destination_index.reset()
+
+def _payload(value, ids):
+    location = {"location_name": "Budget stop", "latitude": 6.93, "longitude": 79.86}
+    payloads = {
+        "booking": {"trip_id": ids["trip"], "passenger_id": ids["rider"], "pickup_location_id": 1, "drop_location_id": 1, "confirmed": False},
+        "location": location,
+        "near": {"lat": 6.93, "lon": 79.86, "radius_km": 20},
+        "passenger": {"user_id": ids["rider"], "trip_id": ids["trip"], "status": "Pending"},
+        "rating": {"trip_id": ids["trip"], "rated_by_user_id": ids["rider"], "driver_id": ids["driver"], "rating": 4, "feedback": "On time"},
+        "trip": {
+            "pickup_location": "Pickup 1", "drop_location": "Drop 2", "date": "2025-03-01T08:00:00", "seats_available": 3,
+            "price": 500.0, "user_id": ids["driver"], "vehicle_id": ids["vehicle"],
+        },
+        "login": {"username": email(ids["rider"]), "password": PASSWORD},
+        "user": {
+            "email": "budget@example.com", "full_name": "Budget User", "password": "password123", "is_driver": False,
+            "nic_number": "B0001", "license_number": "",
+        },
+        "vehicle": {"make": "Toyota", "model": "Aqua", "license_plate": "BUDGET-1", "user_id": ids["driver"], "available_seat": 4, "vehicle_type": "Car"},
+        "fare_quotes": {"quotes": [
+            {"origin_lat": 6.93, "origin_lon": 79.86, "dest_lat": 6.9, "dest_lon": 79.9, "vehicle_type": vehicle_type}
+            for vehicle_type in ("Car", "Van", "Car", "Bike")
+        ]},
+    }
+    if isinstance(value, seeded):
+        return payloads[value]
+    if isinstance(value, dict):
+        return {key: _payload(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_payload(item, ids) for item in value]
+    return value
+
+def test_every_route_has_a_budget():
+    modules = [info.name for info in pkgutil.iter_modules(routers.__path__)]
+    assert sorted(modules) == sorted(BUDGETS), "declare budgets for every module in routers/"
+    for module in modules:
+        budgeted = {(method, path) for method, path, *_ in BUDGETS[module]}
+        missing = declared_routes(import_module(f"routers.{module}").router) - budgeted
+        assert not missing, f"routers/{module}.py routes without a query budget: {sorted(missing)}"
+
+@pytest.mark.parametrize("module, method, route, path, budget, options", CASES, ids=[f"{case[0]} {case[1]} {case[2]}" for case in CASES])
+def test_query_budget(client, budget_db, ids, module, method, route, path, budget, options):
+    engine, async_engine = budget_db
+    options = dict(options)
+    status = options.pop("status", 200)
+    url = PREFIXES[module] + path.format(**ids)
+    _reset_process_caches()
+    with query_budget(budget, engine, async_engine.sync_engine, label=f"{method} {url}"):
+        response = client.request(method, url, **{key: _payload(value, ids) for key, value in options.items()})
+    assert response.status_code == status, response.text
+
+# the facility itself: lazy loading a booking's relations costs a query per booking, joinedload doesn't
+def test_budget_catches_lazy_loads(budget_db, ids):
+    engine, _ = budget_db
+    with sessionmaker(bind=engine)() as session:
+        with query_budget(1, engine):
+            bookings = booking_crud.get_ride_bookings_by_trip(session, ids["trip"])
+            assert len(bookings) > 1 and all(booking.pickup_location for booking in bookings)
+        session.expunge_all()
+        with pytest.raises(QueryBudgetExceeded, match="budget is 1"):
+            with query_budget(1, engine):
+                bookings = session.scalars(select(RideBooking).where(RideBooking.trip_id == ids["trip"])).all()
+                [booking.pickup_location for booking in bookings]
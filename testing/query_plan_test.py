@@ -0,0 +1,95 @@
+import re
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from migrations import runner
+from app_models.rating import Rating
+from schemas.trip import TripListParams
+from crud import booking as booking_crud
+from crud import trip as trip_crud
+from crud import rating as rating_crud
+from routers import trip as trip_router
+
+# EXPLAIN QUERY PLAN checks (SQLite) that the hot lookups search an index instead of scanning their table
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    runner.upgrade(engine, log=lambda message: None) # schema as built by the migrations, indexes included
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+# run fn and return the query plan of every SELECT it issued
+def query_plans(engine, fn):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements, "no SELECT was issued"
+    with engine.connect() as conn:
+        return [
+            [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for statement, parameters in statements
+        ]
+
+def assert_no_full_scan(plans, *tables):
+    for plan in plans:
+        for step in plan:
+            for table in tables:
+                assert not re.match(rf"SCAN {table}\b(?! USING)", step), f"full scan of {table}: {plan}"
+
+def assert_uses_index(plans, index):
+    assert any(index in step for plan in plans for step in plan), f"{index} not used: {plans}"
+
+def test_trips_by_driver_uses_index(engine, db):
+    plans = query_plans(engine, lambda: trip_crud.get_trips_by_driver(db, 1))
+    assert_no_full_scan(plans, "trips")
+    assert_uses_index(plans, "ix_trips_user_id_date")
+
+def test_trips_by_rider_uses_index(engine, db):
+    def call():
+        with pytest.raises(Exception):
+            trip_router.get_trips_by_rider(1, db) # 404 on the empty database, after the passenger lookup
+    plans = query_plans(engine, call)
+    assert_no_full_scan(plans, "passengers")
+    assert_uses_index(plans, "ix_passengers_user_id_trip_id")
+
+def test_booking_lookup_is_one_indexed_query(engine, db):
+    plans = query_plans(engine, lambda: booking_crud.get_booking_id_by_trip_and_user(db, 1, 1))
+    assert len(plans) == 1
+    assert_no_full_scan(plans, "passengers", "ride_bookings") # the planner may drive the join from either index
+
+def test_bookings_of_trip_use_index(engine, db):
+    plans = query_plans(engine, lambda: booking_crud.get_ride_bookings_by_trip(db, 1))
+    assert_no_full_scan(plans, "ride_bookings")
+    assert_uses_index(plans, "ix_ride_bookings_trip_id_passenger_id")
+
+def test_driver_ratings_use_index(engine, db):
+    plans = query_plans(engine, lambda: db.query(Rating).filter(Rating.driver_id == 1).all())
+    assert_no_full_scan(plans, "ratings")
+    assert_uses_index(plans, "ix_ratings_driver_id")
+
+def test_suggestion_driver_stats_use_primary_key(engine, db):
+    plans = query_plans(engine, lambda: rating_crud.get_driver_stats(db, [1, 2]))
+    assert_no_full_scan(plans, "driver_rating_stats")
+
+def test_trip_listing_pages_by_index(engine, db):
+    cursor = trip_crud.encode_cursor(datetime(2025, 1, 1), 10)
+    plans = query_plans(engine, lambda: trip_crud.get_trip_page(db, TripListParams(cursor=cursor), use_entity_cache=True))
+    assert_no_full_scan(plans, "trips")
+    assert_uses_index(plans, "ix_trips_date_id")
@@ -0,0 +1,42 @@
+import pytest
+import config
+from suggestion import distill, sentiment
+
+# stand-in teacher: clear praise / complaints get extreme scores, everything else is in between
+def teacher(texts, batch_size=None):
+    return [5.0 if "great" in text else 1.0 if "rude" in text else 3.0 for text in texts]
+
+@pytest.fixture
+def fast_path(tmp_path, monkeypatch):
+    texts = [f"{word} driver {extra}" for word in ("great", "rude", "okay") for extra in ("today", "again", "on the trip", "as usual", "")]
+    vectorizer, classifier, report = distill.train(texts * 4, teacher(texts * 4), holdout=0)
+    path = str(tmp_path / "fast.joblib")
+    distill.save(path, vectorizer, classifier, "teacher-v1", report)
+
+    bert_calls = []
+    monkeypatch.setattr(config, "SENTIMENT_FAST_PATH", True)
+    monkeypatch.setattr(config, "SENTIMENT_FAST_PATH_MODEL_PATH", path)
+    monkeypatch.setattr(config, "SENTIMENT_SERVER_SOCKET", None)
+    monkeypatch.setattr(sentiment, "_infer", lambda texts, batch_size=None: bert_calls.append(texts) or teacher(texts))
+    monkeypatch.setattr(sentiment, "_bert_version", "teacher-v1")
+    monkeypatch.setattr(sentiment, "_model_version", None)
+    monkeypatch.setattr(sentiment, "_fast", None)
+    monkeypatch.setattr(sentiment, "cache", sentiment.SentimentCache(100))
+    monkeypatch.setattr(sentiment, "path_stats", sentiment.PathStats())
+    return bert_calls
+
+def test_confident_texts_skip_bert(fast_path):
+    scores = sentiment.get_sentiment_scores(["Great driver", "rude driver", "zzz"])
+    # unknown words are never confident - only that text reaches BERT
+    assert fast_path == [["zzz"]]
+    assert scores[0] > 4.5 and scores[1] < 1.5 and scores[2] == 3.0
+    paths = sentiment.get_status()["fast_path"]["paths"]
+    assert (paths["fast"]["texts"], paths["bert"]["texts"]) == (2, 1)
+    assert paths["fast"]["fraction"] == pytest.approx(2 / 3, abs=1e-3)
+    assert "+fast-" in sentiment.get_model_version()
+
+def test_stale_fast_path_is_not_used(fast_path, monkeypatch):
+    monkeypatch.setattr(sentiment, "_bert_version", "retrained-v2")
+    sentiment.get_sentiment_scores(["great driver"])
+    assert fast_path == [["great driver"]]
+    assert "+fast-" not in sentiment.get_model_version()
@@ -0,0 +1,79 @@
+import threading
+import pytest
+import config
+from suggestion import sentiment
+from suggestion.client import SentimentClient, SentimentServerUnavailable
+from suggestion.server import SentimentServer
+
+# the model server with a stand-in model (score = text length), so no torch or BERT download is needed
+
+@pytest.fixture
+def server(tmp_path):
+    calls = []
+
+    def infer(texts):
+        calls.append(list(texts))
+        return [float(len(text)) for text in texts]
+
+    version = {"model_version": "stub"}
+    server = SentimentServer(str(tmp_path / "sentiment.sock"), infer=infer, status=lambda: dict(version, loaded=True),
+                             max_batch=64, max_wait_seconds=0.05)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.calls = calls
+    server.version = version
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_requests_from_many_clients_share_batches(server):
+    results = {}
+
+    # each thread stands in for a worker, with its own connection
+    def worker(i):
+        client = SentimentClient(server.server_address, timeout_seconds=5)
+        results[i] = client.infer(["good", "x" * i, "good"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: [4.0, float(i), 4.0] for i in range(1, 9)}
+    stats = server.batcher.stats()
+    assert stats["requests"] == 8 and stats["batches"] < 8
+    # duplicates within a batch reach the model once
+    assert all(len(call) == len(set(call)) for call in server.calls)
+
+@pytest.fixture
+def remote(server, monkeypatch):
+    monkeypatch.setattr(config, "SENTIMENT_ENABLED", True)
+    monkeypatch.setattr(config, "SENTIMENT_SERVER_SOCKET", server.server_address)
+    monkeypatch.setattr(config, "SENTIMENT_FAST_PATH", False)
+    monkeypatch.setattr(sentiment, "_bert_version", None)
+    monkeypatch.setattr(sentiment, "_model_version", None)
+    monkeypatch.setattr(sentiment, "_fast", None)
+    monkeypatch.setattr(sentiment, "_client", None)
+    monkeypatch.setattr(sentiment, "cache", sentiment.SentimentCache(100))
+    return server
+
+def test_workers_score_through_the_server(remote):
+    assert sentiment.get_model_version() == "stub"
+    assert sentiment.get_sentiment_scores(["Great driver", "late"]) == [12.0, 4.0]
+    assert sentiment.get_status()["server"]["batching"]["texts"] == 2
+    assert sentiment.is_loaded() and sentiment._model is None
+
+# a server restarted with another model file: the worker's scores and cache keys follow its version
+def test_workers_follow_the_server_model_version(remote):
+    assert sentiment.get_sentiment_scores(["Great driver"]) == [12.0]
+    remote.version["model_version"] = "retrained"
+    assert sentiment.get_sentiment_scores(["late"]) == [4.0]
+    assert sentiment.get_model_version() == "retrained"
+    assert sentiment.get_sentiment_scores(["Great driver"]) == [12.0]
+    assert remote.calls[-1] == ["Great driver"] # not answered from the old model's cache entry
+
+def test_server_down(tmp_path):
+    client = SentimentClient(str(tmp_path / "missing.sock"), timeout_seconds=1)
+    with pytest.raises(SentimentServerUnavailable):
+        client.infer(["good"])
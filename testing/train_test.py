@@ -0,0 +1,41 @@
+import numpy as np
+import torch
+from suggestion import train
+
+# a stand-in tokenizer (one id per word) and BERT (embedding = id repeated), so no BERT download is needed
+class Tokenizer:
+    def __call__(self, texts, truncation, max_length):
+        return {"input_ids": [[len(word) for word in text.split()][:max_length] for text in texts]}
+
+    def pad(self, encoded, return_tensors):
+        ids = encoded["input_ids"]
+        width = max(len(row) for row in ids)
+        return {
+            "input_ids": torch.tensor([row + [0] * (width - len(row)) for row in ids]),
+            "attention_mask": torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in ids]),
+        }
+
+class Bert:
+    calls = 0
+
+    def embed(self, input_ids, attention_mask):
+        Bert.calls += 1
+        return input_ids.unsqueeze(-1).float().expand(-1, -1, train.EMBEDDING_DIM)
+
+def test_embeddings_are_cached_once_and_streamed_in_length_buckets(tmp_path):
+    texts = ["a bb", "ccc", "dddd e ff ggg", "hh", "i jj kkk"]
+    cache, seconds = train.EmbeddingCache.build(str(tmp_path), texts, Bert(), Tokenizer(), "cpu", batch_size=2)
+    assert Bert.calls == 3 and seconds > 0
+    assert cache.lengths().tolist() == [2, 1, 4, 1, 3]
+    assert cache[2][:, 0].tolist() == [4, 1, 2, 3]
+
+    # same texts: read from disk, BERT not run again
+    cache, seconds = train.EmbeddingCache.build(str(tmp_path), texts, Bert(), Tokenizer(), "cpu", batch_size=2)
+    assert Bert.calls == 3 and seconds == 0.0
+
+    labels = [1, 0, 1, 0, 1]
+    batches = list(train.loader(cache, np.arange(5), labels, 2, True, 0))
+    assert sorted(label for _, _, batch_labels in batches for label in batch_labels.tolist()) == sorted(labels)
+    for embeddings, lengths, _ in batches:
+        assert embeddings.shape == (len(lengths), int(lengths.max()), train.EMBEDDING_DIM)
+        assert int(lengths.max() - lengths.min()) <= 1 # similar lengths share a batch
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app_models.driver_rating_stats import DriverRatingStats
+from app_models.trip import Trip
+from app_models.user import User
+from app_models.vehicle import Vehicle
+from crud import trip as trip_crud
+from migrations import runner
+from schemas.trip import TripListParams
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    runner.upgrade(engine, log=lambda message: None)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+# drivers 1-4; their trips alternate, two days apart, so the best rated driver's trips are not the earliest
+def seed_trips(db, ratings, trips_per_driver=3):
+    start = datetime(2025, 1, 1)
+    for driver_id, (rating_sum, sentiment_sum, count) in ratings.items():
+        db.add(User(id=driver_id, full_name=f"Driver {driver_id}", email=f"d{driver_id}@example.com", password="-", is_driver=True))
+        db.add(Vehicle(id=driver_id, make="M", model="X", license_plate=f"P{driver_id}", user_id=driver_id, available_seat=4, vehicle_type="Car"))
+        if count:
+            db.add(DriverRatingStats(driver_id=driver_id, rating_count=count, rating_sum=rating_sum, sentiment_sum=sentiment_sum))
+    for n in range(trips_per_driver):
+        for driver_id in ratings:
+            db.add(Trip(pickup_location="A", drop_location="B", date=start + timedelta(days=2 * n + driver_id), seats_available=3,
+                        price=10.0, user_id=driver_id, vehicle_id=driver_id))
+    db.commit()
+
+def all_pages(db, page, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = page(db, TripListParams(cursor=cursor, limit=limit))
+        items.extend(rows)
+        pages += 1
+        if cursor is None:
+            return items, pages
+
+# the ranking is over every trip, not within a date-ordered page: the best driver's trips come first wherever they fall
+def test_suggestions_rank_all_trips_by_driver_rating(db):
+    seed_trips(db, {1: (6.0, 6.0, 2), 2: (0, 0, 0), 3: (9.0, 9.5, 2), 4: (4.0, 4.0, 1)})
+    first_page, _ = trip_crud.get_suggestions(db, TripListParams(limit=2))
+    assert [trip["user_id"] for trip in first_page] == [3, 3]
+
+    items, pages = all_pages(db, trip_crud.get_suggestions, limit=2)
+    assert pages == 6
+    assert [trip["user_id"] for trip in items] == [3] * 3 + [4] * 3 + [1] * 3 + [2] * 3
+    assert items[0]["driver_overall_rating"] == pytest.approx(4.5 * 0.7 + 4.75 * 0.3)
+    assert items[-1]["driver_overall_rating"] is None
+    ids = [trip["id"] for trip in items] # ties by id
+    assert all(ids[i:i + 3] == sorted(ids[i:i + 3]) for i in range(0, 12, 3))
+
+def test_suggestions_reject_a_listing_cursor(db):
+    with pytest.raises(ValueError):
+        trip_crud.get_suggestions(db, TripListParams(cursor=trip_crud.encode_cursor(datetime(2025, 1, 1), 1)))
+
+# a trip whose vehicle row is gone: the cached listing pages exactly like the join, full pages and the same cursors
+def test_cached_listing_pages_like_the_join(db):
+    seed_trips(db, {1: (0, 0, 0), 2: (0, 0, 0), 3: (0, 0, 0)})
+    db.query(Vehicle).filter(Vehicle.id == 2).delete()
+    db.commit()
+
+    def page(use_entity_cache):
+        return lambda db, params: trip_crud.get_trip_page(db, params, use_entity_cache=use_entity_cache)
+
+    joined, _ = all_pages(db, page(False), limit=2)
+    cached, pages = all_pages(db, page(True), limit=2)
+    assert cached == joined and len(cached) == 6 and pages == 3
@@ -203,6 +203,29 @@ def test_booking(client):
      # Assert the response status code and data
     assert response.status_code == 200
 
+def test_create_trips_batch(client):
+    trip_data = {
+        "pickup_location": "Location A",
+        "drop_location": "Location B",
+        "date": "2025-03-03T08:00:00",
+        "seats_available": 3,
+        "price": 50.0,
+        "user_id": 1,
+        "vehicle_id": 1
+    }
+    # a valid trip, one with a missing field, one with an unknown vehicle, another valid trip
+    items = [trip_data, {"pickup_location": "Location A"}, {**trip_data, "vehicle_id": 999}, {**trip_data, "date": "2025-03-10T08:00:00"}]
+    response = client.post("/trips/trips/batch", json={"items": items})
+
+    # valid items are created, the others are reported by position
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 2
+    assert result["ids"][1] is None and result["ids"][2] is None
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert result["errors"][1]["errors"][0]["loc"] == ["vehicle_id"]
+    assert client.get(f"/trips/trips/{result['ids'][3]}").json()["date"] == "2025-03-10T08:00:00"
+
 def test_get_trips_driver(client):  
      # Assume a user with ID 1 exists
     response = client.get("/trips/trips/driver/1") 